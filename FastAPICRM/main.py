@@ -1,9 +1,15 @@
+import os
+import sys
 from typing import Optional
 from pydantic import BaseModel
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+# Modules shared with the other apps live in ../common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.storage import MemoryStore, model_to_row
+
 # FastAPI app
 app = FastAPI()
 
@@ -14,34 +20,33 @@ class Customer(BaseModel):
     phone: Optional[str] = None
     address: Optional[str] = None
 
-# In-memory storage
-customer_list = []
+# In-memory storage (common/storage.py), keyed by customer id
+store = MemoryStore()
 
 # Create
 @app.post("/customers", response_model=Customer)
-def create_customer(customer: Customer):
-    customer_list.append(customer)
+async def create_customer(customer: Customer):
+    if await store.exists(customer.id):
+        raise HTTPException(status_code=400, detail="Customer with this ID already exists")
+    await store.insert(model_to_row(customer))
     return customer
 
 # Read all
 @app.get("/customers", response_model=list[Customer])
-def get_customers():
-    return customer_list
+async def get_customers():
+    return await store.list()
 
 # Update
 @app.put("/customers/{id}", response_model=Customer)
-def update_customer(id: int, customer: Customer):
-    for i, existing_customer in enumerate(customer_list):
-        if existing_customer.id == id:
-            customer_list[i] = customer
-            return customer
-    raise HTTPException(status_code=404, detail="Customer not found")
+async def update_customer(id: int, customer: Customer):
+    if not await store.update(id, model_to_row(customer)):
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return customer
 
 # Delete
 @app.delete("/customers/{id}", response_model=Customer)
-def delete_customer(id: int):
-    for i, existing_customer in enumerate(customer_list):
-        if existing_customer.id == id:
-            deleted_customer = customer_list.pop(i)
-            return deleted_customer
-    raise HTTPException(status_code=404, detail="Customer not found")
+async def delete_customer(id: int):
+    deleted_customer = await store.delete(id)
+    if deleted_customer is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return deleted_customer
@@ -2,15 +2,26 @@ from typing import Optional, List
 from datetime import datetime
 import json
 import os
-import csv
-import pandas as pd
+import sys
+import orjson
 from typing import Any, Dict
 import requests
 from pydantic import BaseModel
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from dotenv import load_dotenv
 
+# Modules shared with the other apps live in ../common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.compression import CompressionMiddleware
+from common.columnar import (
+    ARROW_AVAILABLE, ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE,
+    ArrowStream, ParquetStream, customers_to_batch,
+)
+from common.storage import CsvStore, model_to_row
+
 import re
 load_dotenv(override=True)
 print( os.getenv("GROQ_API_KEY"))
@@ -26,6 +37,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated zstd/gzip for large list and export payloads (see common/compression.py)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 class Customer(BaseModel):
     id: int
     name: str
@@ -56,102 +70,38 @@ class CustomerOut(Customer):
 # CSV file path
 CSV_FILE = "customers.csv"
 
-def load_customers_from_csv() -> List[Customer]:
-    """Load customers from CSV file"""
-    if not os.path.exists(CSV_FILE):
-        return []
-    
-    customers = []
-    try:
-        df = pd.read_csv(CSV_FILE)
-        for _, row in df.iterrows():
-            # Convert string dates back to datetime objects
-            webinar_join = None
-            webinar_leave = None
-            created_at = None
-            closed_at = None
-            
-            if pd.notna(row.get('webinar_join')):
-                webinar_join = datetime.fromisoformat(row['webinar_join'].replace('Z', '+00:00'))
-            if pd.notna(row.get('webinar_leave')):
-                webinar_leave = datetime.fromisoformat(row['webinar_leave'].replace('Z', '+00:00'))
-            if pd.notna(row.get('created_at')):
-                created_at = datetime.fromisoformat(row['created_at'].replace('Z', '+00:00'))
-            if pd.notna(row.get('closed_at')):
-                closed_at = datetime.fromisoformat(row['closed_at'].replace('Z', '+00:00'))
-            
-            customer = Customer(
-                id=int(row['id']),
-                name=str(row['name']),
-                email=str(row['email']),
-                phone=row.get('phone') if pd.notna(row.get('phone')) else None,
-                address=row.get('address') if pd.notna(row.get('address')) else None,
-                country=row.get('country') if pd.notna(row.get('country')) else None,
-                goal=row.get('goal') if pd.notna(row.get('goal')) else None,
-                budget=row.get('budget') if pd.notna(row.get('budget')) else None,
-                webinar_join=webinar_join,
-                webinar_leave=webinar_leave,
-                asked_q=bool(row.get('asked_q', False)),
-                referred=bool(row.get('referred', False)),
-                past_touchpoints=int(row.get('past_touchpoints', 0)),
-                created_at=created_at or datetime.utcnow(),
-                closed_at=closed_at,
-                engaged_mins=int(row['engaged_mins']) if pd.notna(row.get('engaged_mins')) else None,
-                score=int(row['score']) if pd.notna(row.get('score')) else None,
-                reasoning=row.get('reasoning') if pd.notna(row.get('reasoning')) else None,
-                status=row.get('status') if pd.notna(row.get('status')) else None
-            )
-            customers.append(customer)
-    except Exception as e:
-        print(f"Error loading customers from CSV: {e}")
-        return []
-    
-    return customers
+# Customers live in a CsvStore (common/storage.py): held in memory, rewritten
+# to CSV_FILE on every change, and stamped with the change sequence behind
+# GET /customers/changes.
+store = CsvStore(CSV_FILE)
 
-def save_customers_to_csv(customers: List[Customer]):
-    """Save customers to CSV file"""
-    if not customers:
-        return
-    
-    # Convert customers to list of dictionaries
-    data = []
-    for customer in customers:
-        row = {
-            'id': customer.id,
-            'name': customer.name,
-            'email': customer.email,
-            'phone': customer.phone,
-            'address': customer.address,
-            'country': customer.country,
-            'goal': customer.goal,
-            'budget': customer.budget,
-            'webinar_join': customer.webinar_join.isoformat() if customer.webinar_join else None,
-            'webinar_leave': customer.webinar_leave.isoformat() if customer.webinar_leave else None,
-            'asked_q': customer.asked_q,
-            'referred': customer.referred,
-            'past_touchpoints': customer.past_touchpoints,
-            'created_at': customer.created_at.isoformat(),
-            'closed_at': customer.closed_at.isoformat() if customer.closed_at else None,
-            'engaged_mins': customer.engaged_mins,
-            'score': customer.score,
-            'reasoning': customer.reasoning,
-            'status': customer.status
-        }
-        data.append(row)
-    
-    # Save to CSV
-    df = pd.DataFrame(data)
-    df.to_csv(CSV_FILE, index=False)
+def _row_to_customer(row: dict) -> Customer:
+    return Customer(**{k: v for k, v in row.items() if v is not None})
 
-# Load customers from CSV on startup
-customer_list: List[Customer] = load_customers_from_csv()
+async def _all_customers() -> List[Customer]:
+    return [_row_to_customer(row) for row in await store.list()]
+
+def _lead_time_days(customer: Customer) -> Optional[int]:
+    if customer.closed_at is None:
+        return None
+    return max(0, (customer.closed_at - customer.created_at).days)
 
 def _with_lead_time(customer: Customer) -> CustomerOut:
-    lead_days: Optional[int] = None
-    if customer.closed_at is not None:
-        delta = customer.closed_at - customer.created_at
-        lead_days = max(0, delta.days)
-    return CustomerOut(**customer.dict(), lead_time_days=lead_days)
+    return CustomerOut(**customer.dict(), lead_time_days=_lead_time_days(customer))
+
+# Fast path for list responses. Customers are validated once when decoded, so
+# rather than rebuilding a CustomerOut per customer and letting FastAPI
+# validate and serialize it again through response_model, take the model's
+# field values, add lead_time_days and encode straight to JSON bytes.
+def _customer_out_dict(customer: Customer) -> dict:
+    data = dict(customer.__dict__)
+    data['lead_time_days'] = _lead_time_days(customer)
+    return data
+
+def _json_response(payload: Any) -> Response:
+    # orjson is a hard requirement, so timestamps are always written the same
+    # way (UTC as 'Z', like pydantic's own response_model encoding)
+    return Response(content=orjson.dumps(payload, option=orjson.OPT_UTC_Z), media_type="application/json")
 
 
 def _compute_engaged_minutes(customer: Customer) -> Optional[int]:
@@ -335,82 +285,86 @@ def _qualify_customer(customer: Customer) -> Customer:
 
 # Create
 @app.post("/customers", response_model=CustomerOut)
-def create_customer(customer: Customer):
+async def create_customer(customer: Customer):
     # Check if customer ID already exists
-    for existing_customer in customer_list:
-        if existing_customer.id == customer.id:
-            raise HTTPException(status_code=400, detail="Customer with this ID already exists")
-    
-    customer_list.append(customer)
-    save_customers_to_csv(customer_list)
+    if await store.exists(customer.id):
+        raise HTTPException(status_code=400, detail="Customer with this ID already exists")
+    await store.insert(model_to_row(customer))
     return _with_lead_time(customer)
 
 # Read all
 @app.get("/customers", response_model=list[CustomerOut])
-def get_customers():
-    return [_with_lead_time(c) for c in customer_list]
+async def get_customers():
+    return _json_response([_customer_out_dict(c) for c in await _all_customers()])
+
+# Delta sync: customers created/updated after the `since` watermark plus ids
+# deleted since then. Omit `since` (or send an expired one) to get everything
+# with reset=true. Declared before /customers/{id} so "changes" is not an id.
+class CustomerChanges(BaseModel):
+    watermark: str
+    reset: bool
+    changed: List[CustomerOut]
+    deleted: List[int]
+
+@app.get("/customers/changes", response_model=CustomerChanges)
+async def get_customer_changes(since: Optional[str] = None):
+    delta = await store.changes(since)
+    delta["changed"] = [_customer_out_dict(_row_to_customer(row)) for row in delta["changed"]]
+    return _json_response(delta)
 
 # Read single customer
 @app.get("/customers/{id}", response_model=CustomerOut)
-def get_customer(id: int):
-    for customer in customer_list:
-        if customer.id == id:
-            return _with_lead_time(customer)
-    raise HTTPException(status_code=404, detail="Customer not found")
+async def get_customer(id: int):
+    row = await store.get(id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return _with_lead_time(_row_to_customer(row))
 
 # Update
 @app.put("/customers/{id}", response_model=CustomerOut)
-def update_customer(id: int, customer: Customer):
-    for i, existing_customer in enumerate(customer_list):
-        if existing_customer.id == id:
-            customer_list[i] = customer
-            save_customers_to_csv(customer_list)
-            return _with_lead_time(customer)
-    raise HTTPException(status_code=404, detail="Customer not found")
+async def update_customer(id: int, customer: Customer):
+    if not await store.update(id, model_to_row(customer)):
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return _with_lead_time(customer)
 
 # Delete
 @app.delete("/customers/{id}", response_model=CustomerOut)
-def delete_customer(id: int):
-    for i, existing_customer in enumerate(customer_list):
-        if existing_customer.id == id:
-            deleted_customer = customer_list.pop(i)
-            save_customers_to_csv(customer_list)
-            return _with_lead_time(deleted_customer)
-    raise HTTPException(status_code=404, detail="Customer not found")
+async def delete_customer(id: int):
+    row = await store.delete(id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return _with_lead_time(_row_to_customer(row))
 
 
 @app.get("/customers/{id}/lead-time")
-def get_lead_time(id: int):
-    for customer in customer_list:
-        if customer.id == id:
-            lead_days: Optional[int] = None
-            if customer.closed_at is not None:
-                delta = customer.closed_at - customer.created_at
-                lead_days = max(0, delta.days)
-            return {"id": id, "lead_time_days": lead_days}
-    raise HTTPException(status_code=404, detail="Customer not found")
+async def get_lead_time(id: int):
+    row = await store.get(id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return {"id": id, "lead_time_days": _lead_time_days(_row_to_customer(row))}
 
 
 @app.post("/customers/{id}/qualify", response_model=CustomerOut)
-def qualify_customer(id: int):
-    for i, customer in enumerate(customer_list):
-        if customer.id == id:
-            qualified = _qualify_customer(customer)
-            customer_list[i] = qualified
-            save_customers_to_csv(customer_list)
-            return _with_lead_time(qualified)
-    raise HTTPException(status_code=404, detail="Customer not found")
+async def qualify_customer(id: int):
+    row = await store.get(id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    # The Groq call blocks, so it runs in the threadpool
+    qualified = await run_in_threadpool(_qualify_customer, _row_to_customer(row))
+    await store.update(id, model_to_row(qualified))
+    return _with_lead_time(qualified)
 
 # New endpoint to export all data as CSV
 @app.get("/customers/export/csv")
-def export_customers_csv():
+async def export_customers_csv():
     """Export all customers as CSV file"""
-    if not customer_list:
+    customers = await _all_customers()
+    if not customers:
         raise HTTPException(status_code=404, detail="No customers found")
     
     # Create CSV content
     output = []
-    for customer in customer_list:
+    for customer in customers:
         row = {
             'id': customer.id,
             'name': customer.name,
@@ -431,20 +385,54 @@ def export_customers_csv():
             'score': customer.score or '',
             'reasoning': customer.reasoning or '',
             'status': customer.status or '',
-            'lead_time_days': _with_lead_time(customer).lead_time_days or ''
+            'lead_time_days': _lead_time_days(customer) or ''
         }
         output.append(row)
     
-    return {"message": "CSV data exported successfully", "data": output}
+    return _json_response({"message": "CSV data exported successfully", "data": output})
+
+# Columnar exports for analytics: typed, compressed Parquet or an Arrow IPC
+# stream, written in batches of EXPORT_BATCH_SIZE customers.
+EXPORT_BATCH_SIZE = 1000
+
+async def _columnar_export(writer_cls, media_type: str, filename: str):
+    if not ARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="pyarrow is not installed on this server")
+    pages = store.iter_pages(EXPORT_BATCH_SIZE)
+    try:
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=404, detail="No customers found")
+
+    async def body():
+        writer = writer_cls()
+        yield writer.write(customers_to_batch(map(_row_to_customer, first_page)))
+        async for page in pages:
+            yield writer.write(customers_to_batch(map(_row_to_customer, page)))
+        yield writer.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/customers/export/parquet")
+async def export_customers_parquet():
+    """Export all customers as a zstd-compressed Parquet file"""
+    return await _columnar_export(ParquetStream, PARQUET_MEDIA_TYPE, "customers.parquet")
+
+@app.get("/customers/export/arrow")
+async def export_customers_arrow():
+    """Export all customers as an Arrow IPC stream"""
+    return await _columnar_export(ArrowStream, ARROW_STREAM_MEDIA_TYPE, "customers.arrows")
 
 # New endpoint to get CSV file download
 @app.get("/customers/download/csv")
-def download_customers_csv():
+async def download_customers_csv():
     """Download customers as CSV file"""
-    if not customer_list:
+    if not await store.list():
         raise HTTPException(status_code=404, detail="No customers found")
     
-    # Save current data to CSV
-    save_customers_to_csv(customer_list)
-    
+    # The store rewrites CSV_FILE on every change, so it is already current
     return {"message": f"CSV file saved as {CSV_FILE}", "file_path": CSV_FILE}
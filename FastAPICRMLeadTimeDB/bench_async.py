@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: sync (threadpool) vs async Supabase data path
+
+Runs the same point-lookup query the /customers/{id} handler issues, once through
+the blocking supabase-py client on the anyio threadpool (how FastAPI runs `def`
+handlers) and once through the async PostgREST client on the event loop.
+
+Usage:
+    python bench_async.py [--requests 2000] [--levels 50,200,1000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import anyio
+import anyio.to_thread
+from supabase import create_client
+
+import main
+
+
+def _lookup_sync(client, customer_id: int):
+    return client.table("customers").select("*").eq("id", customer_id).execute()
+
+
+async def _lookup_async(client, customer_id: int):
+    return await client.table("customers").select("*").eq("id", customer_id).execute()
+
+
+async def _run_level(mode: str, concurrency: int, total: int, ids, sync_client):
+    """Drive `total` lookups with `concurrency` clients and return (rps, p50, p99) in ms"""
+    if mode == "sync":
+        client = sync_client
+    else:
+        client = await main._get_async_supabase()
+
+    latencies = []
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            customer_id = ids[i % len(ids)]
+            start = time.perf_counter()
+            if mode == "sync":
+                await anyio.to_thread.run_sync(_lookup_sync, client, customer_id)
+            else:
+                await _lookup_async(client, customer_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return total / elapsed, statistics.median(latencies), p99
+
+
+async def _main(args):
+    client = await main._get_async_supabase()
+    resp = await client.table("customers").select("id").limit(1000).execute()
+    ids = [row["id"] for row in (resp.data or [])] or [1]
+    # The app itself only holds the async client; the sync baseline gets its own
+    sync_client = create_client(main.SUPABASE_URL, main.SUPABASE_KEY)
+
+    print(f"🏁 {args.requests} lookups per level over {len(ids)} customer ids")
+    print(f"{'mode':<6} {'clients':>8} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for level in args.levels:
+        for mode in ("sync", "async"):
+            rps, p50, p99 = await _run_level(mode, level, args.requests, ids, sync_client)
+            print(f"{mode:<6} {level:>8} {rps:>10.1f} {p50:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--levels", type=lambda v: [int(x) for x in v.split(",")], default=[50, 200, 1000])
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Compression benchmark: bytes on the wire and added CPU per request
+
+Fills an in-memory store with synthetic leads and requests the large list and
+export endpoints with Accept-Encoding identity, gzip and zstd. Reports the raw
+(still-encoded) response size, wall time per request and the CPU the
+compressor itself costs for that payload.
+
+Usage:
+    python bench_compression.py [--rows 10000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ["CRM_STORAGE"] = "memory"
+
+from fastapi.testclient import TestClient
+
+import main
+from bench_storage import _make_customer
+from common.compression import _Gzip, _Zstd, decompress, zstandard
+
+PATHS = ["/customers", "/customers/export/csv", "/customers/download/csv"]
+
+
+def _fetch(client: TestClient, path: str, encoding: str):
+    start = time.perf_counter()
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as resp:
+        raw = b"".join(resp.iter_raw())
+        used = resp.headers.get("content-encoding", "identity")
+    return raw, used, (time.perf_counter() - start) * 1000
+
+
+def _compress_cpu_ms(body: bytes, encoding: str) -> float:
+    if encoding == "identity":
+        return 0.0
+    compressor = _Zstd(3) if encoding == "zstd" else _Gzip(6)
+    start = time.process_time()
+    compressor.compress(body, final=True)
+    return (time.process_time() - start) * 1000
+
+
+def run(rows: int, repeat: int):
+    asyncio.run(main.store.upsert_many([main._customer_to_row(_make_customer(i)) for i in range(rows)]))
+    client = TestClient(main.app)
+    encodings = ["identity", "gzip"] + (["zstd"] if zstandard is not None else [])
+
+    print(f"🗜️  {rows} customers, median of {repeat} requests")
+    print(f"{'path':<26} {'encoding':<9} {'wire bytes':>12} {'ratio':>7} {'req ms':>9} {'cpu ms':>8}")
+    for path in PATHS:
+        plain, _, _ = _fetch(client, path, "identity")
+        for encoding in encodings:
+            timings = []
+            for _ in range(repeat):
+                raw, used, ms = _fetch(client, path, encoding)
+                timings.append(ms)
+            assert decompress(raw, used) == plain
+            print(f"{path:<26} {used:<9} {len(raw):>12,} {len(plain) / len(raw):>6.1f}x "
+                  f"{statistics.median(timings):>9.1f} {_compress_cpu_ms(plain, encoding):>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
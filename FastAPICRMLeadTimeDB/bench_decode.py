@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Row decoding benchmark for the CRM API
+
+Decodes a page of Supabase-shaped rows (ISO timestamps with an explicit UTC
+offset, as PostgREST returns them) into Customer models, once with the old
+per-row decoder (parse_dt closure + full pydantic validation) and once with
+main._rows_to_customers, and checks both produce the same customers.
+
+Usage:
+    python bench_decode.py [--rows 100000] [--repeat 3]
+"""
+import argparse
+import time
+from datetime import datetime
+from typing import Optional
+
+import main
+from bench_storage import _make_customer
+
+TS_COLUMNS = ("webinar_join", "webinar_leave", "created_at", "closed_at")
+
+
+def _legacy_row_to_customer(row: dict) -> main.Customer:
+    """The decoder main.py used before _rows_to_customers"""
+    def parse_dt(value: Optional[str]) -> Optional[datetime]:
+        if value is None or value == "":
+            return None
+        try:
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except Exception:
+            return None
+    return main.Customer(
+        id=int(row.get('id')),
+        name=str(row.get('name')),
+        email=str(row.get('email')),
+        phone=row.get('phone'),
+        address=row.get('address'),
+        country=row.get('country'),
+        goal=row.get('goal'),
+        budget=row.get('budget'),
+        webinar_join=parse_dt(row.get('webinar_join')),
+        webinar_leave=parse_dt(row.get('webinar_leave')),
+        asked_q=bool(row.get('asked_q', False)),
+        referred=bool(row.get('referred', False)),
+        past_touchpoints=int(row.get('past_touchpoints', 0)),
+        created_at=parse_dt(row.get('created_at')) or datetime.utcnow(),
+        closed_at=parse_dt(row.get('closed_at')),
+        engaged_mins=int(row['engaged_mins']) if row.get('engaged_mins') is not None and str(row.get('engaged_mins')) != '' else None,
+        score=int(row['score']) if row.get('score') is not None and str(row.get('score')) != '' else None,
+        reasoning=row.get('reasoning'),
+        status=row.get('status'),
+    )
+
+
+def _supabase_row(i: int) -> dict:
+    row = main._customer_to_row(_make_customer(i))
+    for column in TS_COLUMNS:
+        if row[column]:
+            row[column] += "+00:00"
+    if i % 3 == 0:
+        row["engaged_mins"] = None
+    return row
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(args):
+    rows = [_supabase_row(i) for i in range(args.rows)]
+    legacy = [_legacy_row_to_customer(r) for r in rows]
+    bulk = main._rows_to_customers(rows)
+    same = all(a.model_dump() == b.model_dump() for a, b in zip(legacy, bulk))
+    print(f"🧪 {args.rows} rows, best of {args.repeat}, identical output: {'✅' if same else '❌'}")
+
+    results = {}
+    for label, fn in (
+        ("legacy", lambda: [_legacy_row_to_customer(r) for r in rows]),
+        ("bulk", lambda: main._rows_to_customers(rows)),
+    ):
+        elapsed = _best_of(fn, args.repeat)
+        results[label] = elapsed
+        print(f"  {label:<8} {elapsed * 1000:>10.1f} ms {elapsed / args.rows * 1e6:>8.2f} µs/row")
+    print(f"⚡ speedup: {results['legacy'] / results['bulk']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    run(parser.parse_args())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Export format benchmark: payload size and client-side load time
+
+Fills an in-memory store with synthetic leads and pulls the same data through
+each export endpoint, then loads it into a pandas DataFrame the way an analyst
+would. Compares the JSON envelope (/customers/export/csv), the streamed CSV
+download, Parquet and the Arrow IPC stream.
+
+Usage:
+    python bench_export.py [--rows 50000]
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import time
+
+os.environ["CRM_STORAGE"] = "memory"
+
+import pandas as pd
+import pyarrow as pa
+from fastapi.testclient import TestClient
+
+import main
+from bench_storage import _make_customer
+
+FORMATS = [
+    ("json", "/customers/export/csv", lambda body: pd.DataFrame(json.loads(body)["data"])),
+    ("csv", "/customers/download/csv", lambda body: pd.read_csv(io.BytesIO(body))),
+    ("parquet", "/customers/export/parquet", lambda body: pd.read_parquet(io.BytesIO(body))),
+    ("arrow", "/customers/export/arrow", lambda body: pa.ipc.open_stream(body).read_pandas()),
+]
+
+
+def run(rows: int):
+    asyncio.run(main.store.upsert_many([main._customer_to_row(_make_customer(i)) for i in range(rows)]))
+    client = TestClient(main.app)
+
+    print(f"📦 {rows} customers")
+    print(f"{'format':<8} {'bytes':>12} {'server ms':>10} {'load ms':>10} {'rows':>8}")
+    for name, path, load in FORMATS:
+        start = time.perf_counter()
+        resp = client.get(path)
+        fetched = time.perf_counter()
+        resp.raise_for_status()
+        df = load(resp.content)
+        loaded = time.perf_counter()
+        print(f"{name:<8} {len(resp.content):>12,} {(fetched - start) * 1000:>10.1f} "
+              f"{(loaded - fetched) * 1000:>10.1f} {len(df):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    run(parser.parse_args().rows)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Serialization micro-benchmark for the CRM list responses
+
+Compares the per-row cost of the old response path (build a CustomerOut per
+row, then let FastAPI validate and encode the list via response_model) with
+the fast path now used by GET /customers, /customers/changes and
+/customers/export/csv (field dict + lead_time_days, encoded by orjson).
+
+Usage:
+    python bench_serialization.py [--rows 10000] [--repeat 5]
+"""
+import argparse
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+import main
+from bench_storage import _make_customer
+
+
+def _legacy(rows) -> bytes:
+    customers = [main._with_lead_time(main._row_to_customer(row)) for row in rows]
+    adapter = TypeAdapter(List[main.CustomerOut])
+    return adapter.dump_json(adapter.validate_python(jsonable_encoder(customers)))
+
+
+def _fast(rows) -> bytes:
+    return main._json_response([main._customer_out_dict(main._row_to_customer(row)) for row in rows]).body
+
+
+def _best_of(fn, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(args):
+    rows = [main._customer_to_row(_make_customer(i)) for i in range(args.rows)]
+    print(f"🧪 {args.rows} rows, best of {args.repeat}, encoder: orjson")
+    results = {}
+    for label, fn in (("legacy", _legacy), ("fast", _fast)):
+        elapsed = _best_of(fn, rows, args.repeat)
+        results[label] = elapsed
+        print(f"  {label:<8} {elapsed * 1000:>10.1f} ms {elapsed / args.rows * 1e6:>8.2f} µs/row")
+    print(f"⚡ speedup: {results['legacy'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    run(parser.parse_args())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Storage backend benchmark for the CRM API
+
+Runs the identical CRUD / list / export workload against every backend in
+common/storage.py so their scaling can be compared side by side. File
+backends use a temporary directory; Supabase is only included with --supabase
+since it writes to the configured project.
+
+Usage:
+    python bench_storage.py [--rows 2000] [--backends memory,csv,sqlite] [--supabase]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import main
+from common.storage import CsvStore, MemoryStore, SqliteStore, SupabaseStore
+
+ID_OFFSET = 10_000_000  # keep benchmark rows clear of real ids on shared stores
+
+
+def _make_customer(i: int) -> main.Customer:
+    created = datetime(2024, 1, 1) + timedelta(hours=i)
+    return main.Customer(
+        id=ID_OFFSET + i,
+        name=f"Lead {i}",
+        email=f"lead{i}@example.com",
+        country=("India", "USA", "Mexico", "China")[i % 4],
+        budget=("Company", "Self")[i % 2],
+        webinar_join=created,
+        webinar_leave=created + timedelta(minutes=30 + i % 90),
+        asked_q=i % 3 == 0,
+        referred=i % 5 == 0,
+        past_touchpoints=i % 8,
+        created_at=created,
+        closed_at=created + timedelta(days=i % 40) if i % 2 else None,
+        score=i % 100,
+        reasoning="Benchmark lead with a reasonably long reasoning string " * 3,
+        status=("Qualified", "Nurture")[i % 2],
+    )
+
+
+async def _timed(label: str, count: int, coro_factory):
+    start = time.perf_counter()
+    await coro_factory()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"  {label:<8} {elapsed * 1000:>10.1f} ms {rate:>12.0f} ops/s")
+
+
+async def _bench(store, rows: int):
+    customers = [_make_customer(i) for i in range(rows)]
+    ids = [c.id for c in customers]
+
+    async def create():
+        for c in customers:
+            if not await store.exists(c.id):
+                await store.insert(main._customer_to_row(c))
+
+    async def read():
+        for cid in ids:
+            await store.get(cid)
+
+    async def update():
+        for cid in ids:
+            await store.update(cid, {"status": "Qualified", "score": 75})
+
+    async def list_all():
+        await store.list()
+
+    async def export():
+        for row in await store.list():
+            main._with_lead_time(main._row_to_customer(row))
+
+    async def delete():
+        for cid in ids:
+            await store.delete(cid)
+
+    print(f"🗄️  {store.name} ({rows} rows)")
+    await _timed("create", rows, create)
+    await _timed("read", rows, read)
+    await _timed("update", rows, update)
+    await _timed("list", rows, list_all)
+    await _timed("export", rows, export)
+    await _timed("delete", rows, delete)
+    await store.close()
+
+
+async def _main(args):
+    tmp = tempfile.mkdtemp(prefix="crm-bench-")
+    factories = {
+        "memory": lambda: MemoryStore(),
+        "csv": lambda: CsvStore(os.path.join(tmp, "customers.csv")),
+        "sqlite": lambda: SqliteStore(os.path.join(tmp, "customers.db")),
+        "supabase": lambda: SupabaseStore(main._get_async_supabase),
+    }
+    backends = list(args.backends)
+    if args.supabase and "supabase" not in backends:
+        backends.append("supabase")
+    for name in backends:
+        await _bench(factories[name](), args.rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--backends", type=lambda v: v.split(","), default=["memory", "csv", "sqlite"])
+    parser.add_argument("--supabase", action="store_true", help="also run against the configured Supabase project")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Bulk import a customers CSV into the configured CRM store
+
+Streams the file in batches through the same path as POST /customers/import
+(`_customer_to_row` + batched upserts). A checkpoint file next to the CSV makes
+the import resumable: rerun the same command after a failure and it picks up
+after the last committed batch.
+
+Usage:
+    CRM_STORAGE=supabase python import_customers.py ../FastAPICRMLeadTime/customers.csv \\
+        [--batch-size 500] [--concurrency 4] [--checkpoint customers.csv.checkpoint.json]
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import main
+from importer import import_csv
+
+
+async def _main(args) -> int:
+    checkpoint = None if args.no_checkpoint else (args.checkpoint or f"{args.csv_path}.checkpoint.json")
+    print(f"📥 Importing {args.csv_path} into {main.store.name} "
+          f"(batch {args.batch_size}, {args.concurrency} in flight)")
+    try:
+        with open(args.csv_path, newline="", encoding="utf-8-sig") as f:
+            report = await import_csv(
+                f, main.store, main._csv_record_to_row,
+                batch_size=args.batch_size, concurrency=args.concurrency, checkpoint_path=checkpoint,
+            )
+    finally:
+        await main.store.close()
+
+    print(json.dumps(report, indent=2))
+    if "failed" in report:
+        print(f"❌ Import stopped after {report['rows_done']} rows; rerun to resume from {checkpoint}")
+        return 1
+    print(f"✅ {report['rows_imported']} rows in {report['elapsed_sec']}s ({report['rows_per_sec']} rows/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("csv_path")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <csv_path>.checkpoint.json)")
+    parser.add_argument("--no-checkpoint", action="store_true", help="always import from the first row")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
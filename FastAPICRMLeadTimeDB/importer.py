@@ -0,0 +1,125 @@
+"""
+Chunked CSV importer shared by POST /customers/import and import_customers.py.
+
+Records are read from a text stream `batch_size` at a time, converted with the
+caller's `to_row` (main.py passes one built on `_customer_to_row`) and upserted
+through the configured store with at most `concurrency` batches in flight.
+With a checkpoint file the importer records how many leading records are
+safely committed, so a rerun after a failure skips straight past them.
+"""
+import asyncio
+import csv
+import json
+import os
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+from common.storage import CustomerStore
+
+MAX_REPORTED_ERRORS = 20
+
+
+def _read_checkpoint(path: Optional[str]) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path, encoding='utf-8') as f:
+        return int(json.load(f).get('rows_done', 0))
+
+
+def _write_checkpoint(path: Optional[str], rows_done: int) -> None:
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'rows_done': rows_done, 'updated_at': time.time()}, f)
+    os.replace(tmp_path, path)
+
+
+async def import_csv(
+    stream: TextIO,
+    store: CustomerStore,
+    to_row: Callable[[Dict[str, str]], Dict[str, Any]],
+    batch_size: int = 500,
+    concurrency: int = 4,
+    checkpoint_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Import every record of a customers CSV and return a summary report"""
+    if batch_size < 1 or concurrency < 1:
+        raise ValueError("batch_size and concurrency must be positive")
+
+    start = time.perf_counter()
+    reader = csv.DictReader(stream)
+    resume_from = _read_checkpoint(checkpoint_path)
+    for _ in islice(reader, resume_from):
+        pass
+
+    semaphore = asyncio.Semaphore(concurrency)
+    pending: set = set()
+    # Batches can finish out of order; the checkpoint only advances over the
+    # contiguous prefix of finished batches.
+    batch_sizes: List[int] = []
+    finished: Dict[int, bool] = {}
+    next_to_commit = 0
+    rows_done = resume_from
+    imported = 0
+    invalid = 0
+    errors: List[Dict[str, Any]] = []
+    failure: Optional[BaseException] = None
+
+    async def run_batch(index: int, rows: List[Dict[str, Any]]) -> None:
+        nonlocal next_to_commit, rows_done, imported, failure
+        try:
+            if rows:
+                await store.upsert_many(rows)
+            imported += len(rows)
+            finished[index] = True
+            while finished.get(next_to_commit):
+                rows_done += batch_sizes[next_to_commit]
+                next_to_commit += 1
+            _write_checkpoint(checkpoint_path, rows_done)
+        except Exception as e:
+            failure = failure or e
+        finally:
+            semaphore.release()
+
+    record_no = resume_from
+    while failure is None:
+        records = list(islice(reader, batch_size))
+        if not records:
+            break
+        rows = []
+        for record in records:
+            record_no += 1
+            try:
+                rows.append(to_row(record))
+            except Exception as e:
+                invalid += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'record': record_no, 'error': str(e)})
+        batch_sizes.append(len(records))
+        await semaphore.acquire()
+        task = asyncio.create_task(run_batch(len(batch_sizes) - 1, rows))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+
+    elapsed = time.perf_counter() - start
+    report = {
+        'rows_imported': imported,
+        'rows_skipped': resume_from,
+        'rows_invalid': invalid,
+        'rows_done': rows_done,
+        'batches': len(batch_sizes),
+        'elapsed_sec': round(elapsed, 3),
+        'rows_per_sec': round(imported / elapsed, 1) if elapsed > 0 else None,
+        'errors': errors,
+    }
+    if failure is not None:
+        report['failed'] = str(failure)
+    elif checkpoint_path and os.path.exists(checkpoint_path):
+        # Finished cleanly; a later run of the same file starts from scratch
+        os.remove(checkpoint_path)
+    return report
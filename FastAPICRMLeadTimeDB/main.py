@@ -1,15 +1,35 @@
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 import json
 import os
-from supabase import create_client, Client
-from typing import Any, Dict
+import io
+import csv
+import tempfile
+import asyncio
+import operator
+import sys
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+import httpx
+import orjson
+from typing import Any, Dict, Iterable, Sequence
 import requests
 from pydantic import BaseModel
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from dotenv import load_dotenv
 
+# Modules shared with the other apps live in ../common
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.compression import CompressionMiddleware
+from common.columnar import (
+    ARROW_AVAILABLE, ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE,
+    ArrowStream, ParquetStream, customers_to_batch,
+)
+from common.storage import CustomerStore, create_store, coerce_csv_record, model_to_row
+from importer import import_csv
+
 import re
 load_dotenv(override=True)
 # FastAPI app
@@ -24,6 +44,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated zstd/gzip for large list and export payloads (see common/compression.py)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 class Customer(BaseModel):
     id: int
     name: str
@@ -62,87 +85,155 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 else:
     print(f"Supabase URL in env: {SUPABASE_URL}")
 
-supabase: Optional[Client] = None
-try:
-    if SUPABASE_URL and SUPABASE_KEY:
-        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-except Exception as e:
-    print(f"Error initializing Supabase client: {e}")
-
-def _get_supabase() -> Client:
-    global supabase, SUPABASE_URL, SUPABASE_KEY
-    if supabase is not None:
-        return supabase
-    # Attempt lazy init using envs (support hot-setting without restart)
-    SUPABASE_URL = (os.getenv("SUPABASE_URL") or "").strip().strip('"').strip("'")
-    SUPABASE_KEY = (os.getenv("SUPABASE_KEY") or "").strip().strip('"').strip("'")
-    if SUPABASE_URL and SUPABASE_KEY:
-        try:
-            supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-            return supabase
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to initialize Supabase client: {e}")
-    raise HTTPException(status_code=500, detail="Supabase client not initialized. Set SUPABASE_URL and SUPABASE_KEY.")
-
-def _row_to_customer(row: dict) -> Customer:
-    def parse_dt(value: Optional[str]) -> Optional[datetime]:
-        if value is None or value == "":
-            return None
+# Async PostgREST client used by the request handlers. A single pooled httpx
+# client lets the event loop multiplex many in-flight DB calls without pinning
+# a worker thread per request.
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "200"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "30"))
+async_supabase: Optional[AsyncClient] = None
+_async_supabase_lock = asyncio.Lock()
+
+async def _get_async_supabase() -> AsyncClient:
+    if async_supabase is not None:
+        return async_supabase
+    async with _async_supabase_lock:
+        return await _init_async_supabase()
+
+async def _init_async_supabase() -> AsyncClient:
+    global async_supabase, SUPABASE_URL, SUPABASE_KEY
+    if async_supabase is not None:
+        return async_supabase
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        SUPABASE_URL = (os.getenv("SUPABASE_URL") or "").strip().strip('"').strip("'")
+        SUPABASE_KEY = (os.getenv("SUPABASE_KEY") or "").strip().strip('"').strip("'")
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise HTTPException(status_code=500, detail="Supabase client not initialized. Set SUPABASE_URL and SUPABASE_KEY.")
+    try:
+        http_client = httpx.AsyncClient(
+            timeout=SUPABASE_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_MAX_CONNECTIONS,
+            ),
+        )
+        async_supabase = await acreate_client(
+            SUPABASE_URL, SUPABASE_KEY, options=AsyncClientOptions(httpx_client=http_client)
+        )
+        return async_supabase
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to initialize Supabase client: {e}")
+
+@app.on_event("shutdown")
+async def _close_async_supabase():
+    if async_supabase is not None:
+        await async_supabase.postgrest.aclose()
+
+# Row decoding. Every list, export and qualify call turns store rows back into
+# Customer models, so a page is decoded column by column with one converter per
+# column, picked once here, and the decoded values are treated as trusted: the
+# models are assembled directly instead of being run through pydantic again.
+def _decode_dt(value: Any) -> Optional[datetime]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        # Pythons before 3.11 reject a trailing 'Z'; anything else unparsable is dropped
         try:
             return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
-        except Exception:
+        except ValueError:
             return None
-    return Customer(
-        id=int(row.get('id')),
-        name=str(row.get('name')),
-        email=str(row.get('email')),
-        phone=row.get('phone'),
-        address=row.get('address'),
-        country=row.get('country'),
-        goal=row.get('goal'),
-        budget=row.get('budget'),
-        webinar_join=parse_dt(row.get('webinar_join')),
-        webinar_leave=parse_dt(row.get('webinar_leave')),
-        asked_q=bool(row.get('asked_q', False)),
-        referred=bool(row.get('referred', False)),
-        past_touchpoints=int(row.get('past_touchpoints', 0)),
-        created_at=parse_dt(row.get('created_at')) or datetime.utcnow(),
-        closed_at=parse_dt(row.get('closed_at')),
-        engaged_mins=int(row['engaged_mins']) if row.get('engaged_mins') is not None and str(row.get('engaged_mins')) != '' else None,
-        score=int(row['score']) if row.get('score') is not None and str(row.get('score')) != '' else None,
-        reasoning=row.get('reasoning'),
-        status=row.get('status'),
-    )
+
+def _decode_dt_column(values: Sequence[Any]) -> List[Optional[datetime]]:
+    fromisoformat = datetime.fromisoformat
+    try:
+        return [None if v is None or v == "" else fromisoformat(v) for v in values]
+    except (TypeError, ValueError):
+        return [_decode_dt(v) for v in values]
+
+def _decode_opt_int_column(values: Sequence[Any]) -> List[Optional[int]]:
+    return [None if v is None or v == "" else int(v) for v in values]
+
+def _decode_count_column(values: Sequence[Any]) -> List[int]:
+    return [0 if v is None else int(v) for v in values]
+
+_COLUMN_DECODERS: Dict[str, Any] = {
+    'id': lambda values: list(map(int, values)),
+    'name': lambda values: list(map(str, values)),
+    'email': lambda values: list(map(str, values)),
+    'webinar_join': _decode_dt_column,
+    'webinar_leave': _decode_dt_column,
+    'asked_q': lambda values: list(map(bool, values)),
+    'referred': lambda values: list(map(bool, values)),
+    'past_touchpoints': _decode_count_column,
+    'created_at': _decode_dt_column,
+    'closed_at': _decode_dt_column,
+    'engaged_mins': _decode_opt_int_column,
+    'score': _decode_opt_int_column,
+}
+_CUSTOMER_FIELDS = tuple(Customer.model_fields)
+_CUSTOMER_FIELD_SET = frozenset(_CUSTOMER_FIELDS)
+_CUSTOMER_FIELD_GETTER = operator.itemgetter(*_CUSTOMER_FIELDS)
+
+def _trusted_customer(values: dict) -> Customer:
+    # Rows come from our own store with every field present and already
+    # decoded, so skip validation; passing the fields set up front saves
+    # model_construct from working it out per row
+    return Customer.model_construct(_fields_set=set(_CUSTOMER_FIELD_SET), **values)
+
+def _rows_to_customers(rows: Iterable[dict]) -> List[Customer]:
+    rows = rows if isinstance(rows, list) else list(rows)
+    if not rows:
+        return []
+    try:
+        records = list(map(_CUSTOMER_FIELD_GETTER, rows))
+    except KeyError:
+        records = [tuple(row.get(name) for name in _CUSTOMER_FIELDS) for row in rows]
+    columns = []
+    for name, values in zip(_CUSTOMER_FIELDS, zip(*records)):
+        decode = _COLUMN_DECODERS.get(name)
+        columns.append(values if decode is None else decode(values))
+    created_at = columns[_CUSTOMER_FIELDS.index('created_at')]
+    if None in created_at:
+        now = datetime.utcnow()
+        created_at[:] = [now if v is None else v for v in created_at]
+    fields = _CUSTOMER_FIELDS
+    return [_trusted_customer(dict(zip(fields, values))) for values in zip(*columns)]
+
+def _row_to_customer(row: dict) -> Customer:
+    return _rows_to_customers([row])[0]
 
 def _customer_to_row(customer: Customer) -> dict:
-    return {
-        'id': customer.id,
-        'name': customer.name,
-        'email': customer.email,
-        'phone': customer.phone,
-        'address': customer.address,
-        'country': customer.country,
-        'goal': customer.goal,
-        'budget': customer.budget,
-        'webinar_join': customer.webinar_join.isoformat() if customer.webinar_join else None,
-        'webinar_leave': customer.webinar_leave.isoformat() if customer.webinar_leave else None,
-        'asked_q': customer.asked_q,
-        'referred': customer.referred,
-        'past_touchpoints': customer.past_touchpoints,
-        'created_at': customer.created_at.isoformat() if isinstance(customer.created_at, datetime) else customer.created_at,
-        'closed_at': customer.closed_at.isoformat() if customer.closed_at else None,
-        'engaged_mins': customer.engaged_mins,
-        'score': customer.score,
-        'reasoning': customer.reasoning,
-        'status': customer.status,
-    }
+    return model_to_row(customer)
+
+def _csv_record_to_row(record: Dict[str, str]) -> dict:
+    """Validate one customers.csv record and convert it to a storage row"""
+    values = {k: v for k, v in coerce_csv_record(record).items() if v is not None}
+    return _customer_to_row(Customer(**values))
+
+def _lead_time_days(customer: Customer) -> Optional[int]:
+    if customer.closed_at is None:
+        return None
+    return max(0, (customer.closed_at - customer.created_at).days)
 
 def _with_lead_time(customer: Customer) -> CustomerOut:
-    lead_days: Optional[int] = None
-    if customer.closed_at is not None:
-        delta = customer.closed_at - customer.created_at
-        lead_days = max(0, delta.days)
-    return CustomerOut(**customer.dict(), lead_time_days=lead_days)
+    return CustomerOut(**customer.dict(), lead_time_days=_lead_time_days(customer))
+
+# Fast path for list responses. Customers decoded from store rows are already
+# trusted, so rather than rebuilding a CustomerOut per row and letting
+# FastAPI validate and serialize it again through response_model, take the
+# model's field values, add lead_time_days and encode straight to JSON bytes.
+def _customer_out_dict(customer: Customer) -> dict:
+    data = dict(customer.__dict__)
+    data['lead_time_days'] = _lead_time_days(customer)
+    return data
+
+def _json_response(payload: Any) -> Response:
+    # orjson is a hard requirement, so timestamps are always written the same
+    # way (UTC as 'Z', like pydantic's own response_model encoding)
+    return Response(content=orjson.dumps(payload, option=orjson.OPT_UTC_Z), media_type="application/json")
 
 
 def _compute_engaged_minutes(customer: Customer) -> Optional[int]:
@@ -324,19 +415,22 @@ def _qualify_customer(customer: Customer) -> Customer:
         pass
     return customer
 
+# Storage backend (see common/storage.py); Supabase unless CRM_STORAGE says otherwise
+CRM_STORAGE = (os.getenv("CRM_STORAGE") or "supabase").strip().lower()
+store: CustomerStore = create_store(CRM_STORAGE, _get_async_supabase)
+
+@app.on_event("shutdown")
+async def _close_store():
+    await store.close()
+
 # Create
 @app.post("/customers", response_model=CustomerOut)
-def create_customer(customer: Customer):
-    client = _get_supabase()
+async def create_customer(customer: Customer):
     # Check if customer ID already exists
     try:
-        resp = client.table("customers").select("id").eq("id", customer.id).execute()
-        data = getattr(resp, 'data', None) or (resp.get('data') if isinstance(resp, dict) else None)
-        if data and len(data) > 0:
+        if await store.exists(customer.id):
             raise HTTPException(status_code=400, detail="Customer with this ID already exists")
-        row = _customer_to_row(customer)
-        ins = client.table("customers").insert(row).execute()
-        _ = getattr(ins, 'data', None) or (ins.get('data') if isinstance(ins, dict) else None)
+        await store.insert(_customer_to_row(customer))
         return _with_lead_time(customer)
     except HTTPException:
         raise
@@ -345,28 +439,102 @@ def create_customer(customer: Customer):
 
 # Read all
 @app.get("/customers", response_model=list[CustomerOut])
-def get_customers():
-    client = _get_supabase()
+async def get_customers():
     try:
-        resp = client.table("customers").select("*").execute()
-        rows = getattr(resp, 'data', None) or (resp.get('data') if isinstance(resp, dict) else [])
-        customers: List[CustomerOut] = []
-        for row in rows or []:
-            customers.append(_with_lead_time(_row_to_customer(row)))
-        return customers
+        rows = await store.list()
+        return _json_response([_customer_out_dict(c) for c in _rows_to_customers(rows)])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch customers: {e}")
 
+# Delta sync: only rows created/updated after the `since` watermark plus ids
+# deleted since then. Omit `since` (or send an expired one) to get everything
+# with reset=true. Declared before /customers/{id} so "changes" is not an id.
+class CustomerChanges(BaseModel):
+    watermark: str
+    reset: bool
+    changed: List[CustomerOut]
+    deleted: List[int]
+
+@app.get("/customers/changes", response_model=CustomerChanges)
+async def get_customer_changes(since: Optional[str] = None):
+    try:
+        delta = await store.changes(since)
+        delta["changed"] = [_customer_out_dict(c) for c in _rows_to_customers(delta["changed"])]
+        return _json_response(delta)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch customer changes: {e}")
+
+# Bulk import: POST a customers.csv body (text/csv). It is spooled to a
+# temporary file as it arrives and upserted in batches; pass `checkpoint` to
+# make a failed import resumable by re-posting the same file.
+IMPORT_CHECKPOINT_DIR = os.getenv("CRM_IMPORT_CHECKPOINT_DIR", "import_checkpoints")
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+@app.post("/customers/import")
+async def import_customers(
+    request: Request,
+    batch_size: int = Query(500, ge=1, le=5000),
+    concurrency: int = Query(4, ge=1, le=32),
+    checkpoint: Optional[str] = Query(None, pattern=r"^[A-Za-z0-9_-]{1,64}$"),
+):
+    checkpoint_path = None
+    if checkpoint:
+        os.makedirs(IMPORT_CHECKPOINT_DIR, exist_ok=True)
+        checkpoint_path = os.path.join(IMPORT_CHECKPOINT_DIR, f"{checkpoint}.json")
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as spool:
+            async for chunk in request.stream():
+                spool.write(chunk)
+            spool.seek(0)
+            text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+            report = await import_csv(
+                text, store, _csv_record_to_row,
+                batch_size=batch_size, concurrency=concurrency, checkpoint_path=checkpoint_path,
+            )
+            text.detach()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to import customers: {e}")
+    if "failed" in report:
+        raise HTTPException(status_code=502, detail=report)
+    return report
+
+# Aggregates: computed by the storage backend (SQL view/RPC for Supabase and
+# SQLite) so only the small summary crosses the wire. Declared before the
+# /customers/{id}/... routes so "stats" is not parsed as an id.
+GroupBy = Optional[Literal["country", "budget", "referred"]]
+
+async def _aggregate(stat: str, group_by: Optional[str], bucket_size: int = 10):
+    try:
+        groups = await store.aggregate(stat, group_by, bucket_size)
+        return {"group_by": group_by, "groups": groups}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to compute {stat} stats: {e}")
+
+@app.get("/customers/stats/lead-time")
+async def get_lead_time_stats(group_by: GroupBy = None):
+    """Lead-time count, mean and p50/p75/p90 (days) over closed customers"""
+    return await _aggregate("lead_time", group_by)
+
+@app.get("/customers/stats/status")
+async def get_status_counts(group_by: GroupBy = None):
+    """Customer counts per qualification status"""
+    return await _aggregate("status", group_by)
+
+@app.get("/customers/stats/score-histogram")
+async def get_score_histogram(group_by: GroupBy = None, bucket_size: int = Query(10, ge=1, le=100)):
+    """Score histogram with buckets of `bucket_size` points"""
+    return await _aggregate("score", group_by, bucket_size)
+
 # Read single customer
 @app.get("/customers/{id}", response_model=CustomerOut)
-def get_customer(id: int):
-    client = _get_supabase()
+async def get_customer(id: int):
     try:
-        resp = client.table("customers").select("*").eq("id", id).execute()
-        rows = getattr(resp, 'data', None) or (resp.get('data') if isinstance(resp, dict) else [])
-        if not rows:
+        row = await store.get(id)
+        if row is None:
             raise HTTPException(status_code=404, detail="Customer not found")
-        customer = _row_to_customer(rows[0])
+        customer = _row_to_customer(row)
         return _with_lead_time(customer)
     except HTTPException:
         raise
@@ -375,18 +543,10 @@ def get_customer(id: int):
 
 # Update
 @app.put("/customers/{id}", response_model=CustomerOut)
-def update_customer(id: int, customer: Customer):
-    client = _get_supabase()
+async def update_customer(id: int, customer: Customer):
     try:
-        row = _customer_to_row(customer)
-        upd = client.table("customers").update(row).eq("id", id).execute()
-        data = getattr(upd, 'data', None) or (upd.get('data') if isinstance(upd, dict) else None)
-        if data is None:
-            # Some clients return empty data for update; verify existence
-            chk = client.table("customers").select("id").eq("id", id).execute()
-            chk_rows = getattr(chk, 'data', None) or (chk.get('data') if isinstance(chk, dict) else [])
-            if not chk_rows:
-                raise HTTPException(status_code=404, detail="Customer not found")
+        if not await store.update(id, _customer_to_row(customer)):
+            raise HTTPException(status_code=404, detail="Customer not found")
         return _with_lead_time(customer)
     except HTTPException:
         raise
@@ -395,18 +555,12 @@ def update_customer(id: int, customer: Customer):
 
 # Delete
 @app.delete("/customers/{id}", response_model=CustomerOut)
-def delete_customer(id: int):
-    client = _get_supabase()
+async def delete_customer(id: int):
     try:
-        # Fetch the customer first for response
-        resp = client.table("customers").select("*").eq("id", id).execute()
-        rows = getattr(resp, 'data', None) or (resp.get('data') if isinstance(resp, dict) else [])
-        if not rows:
+        row = await store.delete(id)
+        if row is None:
             raise HTTPException(status_code=404, detail="Customer not found")
-        customer = _row_to_customer(rows[0])
-        # Delete
-        client.table("customers").delete().eq("id", id).execute()
-        return _with_lead_time(customer)
+        return _with_lead_time(_row_to_customer(row))
     except HTTPException:
         raise
     except Exception as e:
@@ -414,14 +568,12 @@ def delete_customer(id: int):
 
 
 @app.get("/customers/{id}/lead-time")
-def get_lead_time(id: int):
-    client = _get_supabase()
+async def get_lead_time(id: int):
     try:
-        resp = client.table("customers").select("created_at, closed_at").eq("id", id).execute()
-        rows = getattr(resp, 'data', None) or (resp.get('data') if isinstance(resp, dict) else [])
-        if not rows:
+        row = await store.get(id)
+        if row is None:
             raise HTTPException(status_code=404, detail="Customer not found")
-        tmp = _row_to_customer(rows[0])
+        tmp = _row_to_customer(row)
         lead_days: Optional[int] = None
         if tmp.closed_at is not None:
             delta = tmp.closed_at - tmp.created_at
@@ -434,22 +586,21 @@ def get_lead_time(id: int):
 
 
 @app.post("/customers/{id}/qualify", response_model=CustomerOut)
-def qualify_customer(id: int):
-    client = _get_supabase()
+async def qualify_customer(id: int):
     try:
-        resp = client.table("customers").select("*").eq("id", id).execute()
-        rows = getattr(resp, 'data', None) or (resp.get('data') if isinstance(resp, dict) else [])
-        if not rows:
+        row = await store.get(id)
+        if row is None:
             raise HTTPException(status_code=404, detail="Customer not found")
-        customer = _row_to_customer(rows[0])
-        qualified = _qualify_customer(customer)
+        customer = _row_to_customer(row)
+        # Groq call is blocking; keep it off the event loop
+        qualified = await run_in_threadpool(_qualify_customer, customer)
         update_fields = {
             'engaged_mins': qualified.engaged_mins,
             'score': qualified.score,
             'reasoning': qualified.reasoning,
             'status': qualified.status,
         }
-        client.table("customers").update(update_fields).eq("id", id).execute()
+        await store.update(id, update_fields)
         return _with_lead_time(qualified)
     except HTTPException:
         raise
@@ -458,17 +609,14 @@ def qualify_customer(id: int):
 
 # New endpoint to export all data as CSV
 @app.get("/customers/export/csv")
-def export_customers_csv():
+async def export_customers_csv():
     """Export all customers as CSV-like JSON array (no file I/O)"""
-    client = _get_supabase()
     try:
-        resp = client.table("customers").select("*").execute()
-        rows = getattr(resp, 'data', None) or (resp.get('data') if isinstance(resp, dict) else [])
+        rows = await store.list()
         if not rows:
             raise HTTPException(status_code=404, detail="No customers found")
         output = []
-        for row in rows:
-            customer = _row_to_customer(row)
+        for customer in _rows_to_customers(rows):
             output.append({
                 'id': customer.id,
                 'name': customer.name,
@@ -489,58 +637,110 @@ def export_customers_csv():
                 'score': customer.score or '',
                 'reasoning': customer.reasoning or '',
                 'status': customer.status or '',
-                'lead_time_days': _with_lead_time(customer).lead_time_days or ''
+                'lead_time_days': _lead_time_days(customer) or ''
             })
-        return {"message": "Data exported successfully", "data": output}
+        return _json_response({"message": "Data exported successfully", "data": output})
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to export data: {e}")
 
+EXPORT_PAGE_SIZE = int(os.getenv("CRM_EXPORT_PAGE_SIZE", "1000"))
+
+# Columnar exports for analytics: typed, compressed Parquet (one row group per
+# page) or an Arrow IPC stream, both streamed as the pages arrive.
+async def _columnar_export(writer_cls, media_type: str, filename: str):
+    if not ARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="pyarrow is not installed on this server")
+    try:
+        pages = store.iter_pages(EXPORT_PAGE_SIZE)
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=404, detail="No customers found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export data: {e}")
+
+    async def body():
+        writer = writer_cls()
+        yield writer.write(customers_to_batch(_rows_to_customers(first_page)))
+        async for page in pages:
+            yield writer.write(customers_to_batch(_rows_to_customers(page)))
+        yield writer.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/customers/export/parquet")
+async def export_customers_parquet():
+    """Export all customers as a zstd-compressed Parquet file"""
+    return await _columnar_export(ParquetStream, PARQUET_MEDIA_TYPE, "customers.parquet")
+
+@app.get("/customers/export/arrow")
+async def export_customers_arrow():
+    """Export all customers as an Arrow IPC stream"""
+    return await _columnar_export(ArrowStream, ARROW_STREAM_MEDIA_TYPE, "customers.arrows")
+
 # New endpoint to get CSV file download
+CSV_HEADERS = [
+    'id','name','email','phone','address','country','goal','budget','webinar_join','webinar_leave',
+    'asked_q','referred','past_touchpoints','created_at','closed_at','engaged_mins','score','reasoning','status','lead_time_days'
+]
+
+def _csv_values(customer: Customer) -> list:
+    lead_time_days = _lead_time_days(customer)
+    return [
+        customer.id,
+        customer.name,
+        customer.email,
+        customer.phone or '',
+        customer.address or '',
+        customer.country or '',
+        customer.goal or '',
+        customer.budget or '',
+        customer.webinar_join.isoformat() if customer.webinar_join else '',
+        customer.webinar_leave.isoformat() if customer.webinar_leave else '',
+        'true' if customer.asked_q else 'false',
+        'true' if customer.referred else 'false',
+        customer.past_touchpoints,
+        customer.created_at.isoformat(),
+        customer.closed_at.isoformat() if customer.closed_at else '',
+        '' if customer.engaged_mins is None else customer.engaged_mins,
+        '' if customer.score is None else customer.score,
+        customer.reasoning or '',
+        customer.status or '',
+        '' if lead_time_days is None else lead_time_days,
+    ]
+
+def _csv_chunk(rows: List[dict], header: bool = False) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)  # RFC 4180 quoting, CRLF line endings
+    if header:
+        writer.writerow(CSV_HEADERS)
+    for customer in _rows_to_customers(rows):
+        writer.writerow(_csv_values(customer))
+    return buf.getvalue()
+
 @app.get("/customers/download/csv")
-def download_customers_csv():
-    """Return customers as CSV string (no filesystem write)"""
-    client = _get_supabase()
+async def download_customers_csv():
+    """Stream customers as a text/csv download, one database page at a time"""
     try:
-        resp = client.table("customers").select("*").execute()
-        rows = getattr(resp, 'data', None) or (resp.get('data') if isinstance(resp, dict) else [])
-        if not rows:
-            raise HTTPException(status_code=404, detail="No customers found")
-        # Build CSV string in-memory
-        headers = [
-            'id','name','email','phone','address','country','goal','budget','webinar_join','webinar_leave',
-            'asked_q','referred','past_touchpoints','created_at','closed_at','engaged_mins','score','reasoning','status','lead_time_days'
-        ]
-        lines = [",".join(headers)]
-        for row in rows:
-            customer = _row_to_customer(row)
-            values = [
-                str(customer.id),
-                (customer.name or '').replace(',', ' '),
-                (customer.email or '').replace(',', ' '),
-                (customer.phone or '').replace(',', ' '),
-                (customer.address or '').replace(',', ' '),
-                (customer.country or '').replace(',', ' '),
-                (customer.goal or '').replace(',', ' '),
-                (customer.budget or '').replace(',', ' '),
-                customer.webinar_join.isoformat() if customer.webinar_join else '',
-                customer.webinar_leave.isoformat() if customer.webinar_leave else '',
-                'true' if customer.asked_q else 'false',
-                'true' if customer.referred else 'false',
-                str(customer.past_touchpoints),
-                customer.created_at.isoformat(),
-                customer.closed_at.isoformat() if customer.closed_at else '',
-                '' if customer.engaged_mins is None else str(customer.engaged_mins),
-                '' if customer.score is None else str(customer.score),
-                (customer.reasoning or '').replace('\n', ' ').replace(',', ' '),
-                (customer.status or ''),
-                '' if _with_lead_time(customer).lead_time_days is None else str(_with_lead_time(customer).lead_time_days),
-            ]
-            lines.append(",".join(values))
-        csv_content = "\n".join(lines)
-        return {"filename": "customers.csv", "content_type": "text/csv", "content": csv_content}
-    except HTTPException:
-        raise
+        pages = store.iter_pages(EXPORT_PAGE_SIZE)
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=404, detail="No customers found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to build CSV: {e}")
+
+    async def body():
+        yield _csv_chunk(first_page, header=True)
+        async for page in pages:
+            yield _csv_chunk(page)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="customers.csv"'},
+    )
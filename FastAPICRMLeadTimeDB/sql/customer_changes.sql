@@ -0,0 +1,41 @@
+-- Change tracking behind GET /customers/changes.
+-- Run once in the Supabase SQL editor after the customers table exists.
+
+alter table customers add column if not exists updated_at timestamptz not null default clock_timestamp();
+create index if not exists customers_updated_at_idx on customers (updated_at);
+
+create table if not exists customer_tombstones (
+    id bigint primary key,
+    deleted_at timestamptz not null default clock_timestamp()
+);
+create index if not exists customer_tombstones_deleted_at_idx on customer_tombstones (deleted_at);
+
+create or replace function crm_touch_customer() returns trigger
+language plpgsql as $$
+begin
+    new.updated_at := clock_timestamp();
+    if tg_op = 'UPDATE' and old.id <> new.id then
+        insert into customer_tombstones (id, deleted_at) values (old.id, clock_timestamp())
+        on conflict (id) do update set deleted_at = excluded.deleted_at;
+    end if;
+    delete from customer_tombstones where id = new.id;
+    return new;
+end;
+$$;
+
+create or replace function crm_tombstone_customer() returns trigger
+language plpgsql as $$
+begin
+    insert into customer_tombstones (id, deleted_at) values (old.id, clock_timestamp())
+    on conflict (id) do update set deleted_at = excluded.deleted_at;
+    return old;
+end;
+$$;
+
+drop trigger if exists customers_touch on customers;
+create trigger customers_touch before insert or update on customers
+    for each row execute function crm_touch_customer();
+
+drop trigger if exists customers_tombstone on customers;
+create trigger customers_tombstone after delete on customers
+    for each row execute function crm_tombstone_customer();
@@ -0,0 +1,81 @@
+-- Aggregate functions behind the /customers/stats/* endpoints.
+-- Run once in the Supabase SQL editor; PostgREST exposes them as RPCs.
+-- group_by is whitelisted before it is spliced into the query. Text is sorted
+-- with the "C" collation and nulls last, the order the SQLite and in-memory
+-- stores use, so every backend returns groups in the same order.
+
+create or replace function crm_lead_time_stats(group_by text default null)
+returns table (
+    "group" text,
+    customers bigint,
+    closed bigint,
+    avg_days double precision,
+    p50_days double precision,
+    p75_days double precision,
+    p90_days double precision
+)
+language plpgsql stable as $$
+begin
+    if group_by is not null and group_by not in ('country', 'budget', 'referred') then
+        raise exception 'unsupported group_by: %', group_by;
+    end if;
+    return query execute format($q$
+        with t as (
+            select %s as grp,
+                   case when closed_at is null then null
+                        else greatest(0, floor(extract(epoch from (closed_at::timestamptz - created_at::timestamptz)) / 86400))
+                   end as lead_days
+            from customers
+        )
+        select grp,
+               count(*),
+               count(lead_days),
+               avg(lead_days)::double precision,
+               percentile_disc(0.5) within group (order by lead_days)::double precision,
+               percentile_disc(0.75) within group (order by lead_days)::double precision,
+               percentile_disc(0.9) within group (order by lead_days)::double precision
+        from t
+        group by grp
+        order by grp collate "C" nulls last
+    $q$, coalesce(quote_ident(group_by) || '::text', 'null::text'));
+end;
+$$;
+
+create or replace function crm_status_counts(group_by text default null)
+returns table ("group" text, status text, count bigint)
+language plpgsql stable as $$
+begin
+    if group_by is not null and group_by not in ('country', 'budget', 'referred') then
+        raise exception 'unsupported group_by: %', group_by;
+    end if;
+    return query execute format($q$
+        select grp, status, count(*)
+        from (select %s as grp, status from customers) t
+        group by grp, status
+        order by grp collate "C" nulls last, status collate "C" nulls last
+    $q$, coalesce(quote_ident(group_by) || '::text', 'null::text'));
+end;
+$$;
+
+create or replace function crm_score_histogram(group_by text default null, bucket_size int default 10)
+returns table ("group" text, bucket int, count bigint)
+language plpgsql stable as $$
+begin
+    if group_by is not null and group_by not in ('country', 'budget', 'referred') then
+        raise exception 'unsupported group_by: %', group_by;
+    end if;
+    if bucket_size is null or bucket_size < 1 then
+        raise exception 'bucket_size must be positive';
+    end if;
+    return query execute format($q$
+        select grp, bucket, count(*)
+        from (
+            select %s as grp, (floor(score::numeric / %s) * %s)::int as bucket
+            from customers
+            where score is not null
+        ) t
+        group by grp, bucket
+        order by grp collate "C" nulls last, bucket
+    $q$, coalesce(quote_ident(group_by) || '::text', 'null::text'), bucket_size, bucket_size);
+end;
+$$;
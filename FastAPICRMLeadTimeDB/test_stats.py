@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Consistency test for the /customers/stats/* aggregates
+
+Loads one set of customers, with NULL countries, budgets, statuses and scores
+among them, into every store that can run locally and checks that each
+stat/group_by combination comes back identical from all of them, ordering
+included (NULL groups and statuses last, text in byte order):
+
+- memory and csv: the Python fallback in common/storage.py
+- sqlite: SqliteStore's SQL
+- supabase: with --postgres, sql/customer_stats.sql is loaded into a scratch
+  schema of that database and SupabaseStore.aggregate reads the RPC results
+  the way PostgREST returns them (needs psycopg)
+
+Usage:
+    python test_stats.py [--rows 60] [--postgres postgresql://localhost/crm]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(HERE))
+from common.storage import (  # noqa: E402
+    COLUMNS, GROUP_COLUMNS, STATS, CsvStore, MemoryStore, SqliteStore, SupabaseStore,
+)
+
+
+def _rows(n: int):
+    rows = []
+    for i in range(n):
+        created = datetime(2024, 1, 1) + timedelta(hours=7 * i)
+        rows.append({
+            'id': i + 1,
+            'name': f"Lead {i}",
+            'email': f"lead{i}@example.com",
+            'phone': None,
+            'address': None,
+            # lower-case 'brazil' sorts after 'USA' in byte order but not in most locales
+            'country': ("India", "USA", None, "brazil", "Mexico")[i % 5],
+            'goal': None,
+            'budget': ("Company", None, "Self")[i % 3],
+            'webinar_join': None,
+            'webinar_leave': None,
+            'asked_q': i % 2 == 0,
+            'referred': i % 4 == 0,
+            'past_touchpoints': i % 6,
+            'created_at': created.isoformat(),
+            'closed_at': (created + timedelta(days=i % 17, hours=5)).isoformat() if i % 3 else None,
+            'engaged_mins': None,
+            'score': None if i % 4 == 1 else (i * 13) % 101,
+            'reasoning': None,
+            'status': ("Qualified", "Nurture", None)[i // 2 % 3],
+        })
+    return rows
+
+
+class _PostgresRpc:
+    """Answers SupabaseStore's client.rpc(...).execute() from a Postgres connection"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def rpc(self, name: str, params: dict):
+        args = ", ".join(f"{key} => %({key})s" for key in params)
+        sql = f"SELECT * FROM {name}({args})"
+
+        async def execute():
+            with self._conn.cursor() as cur:
+                cur.execute(sql, params)
+                names = [d.name for d in cur.description]
+                data = [dict(zip(names, r)) for r in cur.fetchall()]
+            # PostgREST hands the rows over as JSON
+            return SimpleNamespace(data=json.loads(json.dumps(data)))
+
+        return SimpleNamespace(execute=execute)
+
+
+def _postgres_store(dsn: str, rows):
+    import psycopg
+
+    conn = psycopg.connect(dsn, autocommit=True)
+    schema = f"crm_stats_test_{os.getpid()}"
+    conn.execute(f"CREATE SCHEMA {schema}")
+    conn.execute(f"SET search_path TO {schema}")
+    conn.execute("""
+        CREATE TABLE customers (
+            id bigint PRIMARY KEY, name text, email text, phone text, address text, country text,
+            goal text, budget text, webinar_join timestamp, webinar_leave timestamp,
+            asked_q boolean, referred boolean, past_touchpoints int, created_at timestamp,
+            closed_at timestamp, engaged_mins int, score int, reasoning text, status text
+        )
+    """)
+    with open(os.path.join(HERE, "sql", "customer_stats.sql"), encoding="utf-8") as f:
+        conn.execute(f.read())
+    with conn.cursor() as cur:
+        cur.executemany(
+            f"INSERT INTO customers ({', '.join(COLUMNS)}) VALUES ({', '.join('%s' for _ in COLUMNS)})",
+            [tuple(row[c] for c in COLUMNS) for row in rows],
+        )
+    client = _PostgresRpc(conn)
+
+    async def get_client():
+        return client
+
+    def drop():
+        conn.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.close()
+
+    return SupabaseStore(get_client), drop
+
+
+def _normalized(result):
+    # SQL and Python may sum the same days in a different order
+    return [{k: round(v, 9) if isinstance(v, float) else v for k, v in row.items()} for row in result]
+
+
+async def _run(args, work_dir: str) -> bool:
+    rows = _rows(args.rows)
+    stores = {"memory": MemoryStore(rows)}
+    stores["csv"] = CsvStore(os.path.join(work_dir, "customers.csv"))
+    stores["sqlite"] = SqliteStore(os.path.join(work_dir, "customers.db"))
+    await stores["csv"].upsert_many(rows)
+    await stores["sqlite"].upsert_many(rows)
+    cleanup = None
+    if args.postgres:
+        stores["supabase"], cleanup = _postgres_store(args.postgres, rows)
+    else:
+        print("⏭️  supabase: skipped (pass --postgres DSN to check sql/customer_stats.sql)")
+
+    ok = True
+    try:
+        for stat in STATS:
+            for group_by in (None,) + GROUP_COLUMNS:
+                expected = _normalized(await stores["memory"].aggregate(stat, group_by, 10))
+                agree = True
+                for name, store in stores.items():
+                    if name == "memory":
+                        continue
+                    got = _normalized(await store.aggregate(stat, group_by, 10))
+                    if got != expected:
+                        agree = ok = False
+                        print(f"❌ {stat} by {group_by}: {name} differs from memory")
+                        print(f"   memory: {expected}")
+                        print(f"   {name + ':':<7} {got}")
+                print(f"{'✅' if agree else '❌'} {stat:<9} by {str(group_by):<8} {len(expected):>3} rows")
+    finally:
+        await stores["sqlite"].close()
+        if cleanup:
+            cleanup()
+    return ok
+
+
+def main(args) -> bool:
+    work_dir = tempfile.mkdtemp(prefix="crm-test-")
+    try:
+        ok = asyncio.run(_run(args, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print("✅ all stores agree" if ok else "❌ stores disagree")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=60)
+    parser.add_argument("--postgres", help="Postgres DSN to check the RPC functions against (optional)")
+    sys.exit(0 if main(parser.parse_args()) else 1)
@@ -10,13 +10,24 @@ st.title("📇 Customer Relationship Management System")
 
 # --------------- Helpers ---------------
 def fetch_customers():
+    # Keep the list in session state and only pull what changed since the last
+    # rerun, so a refresh costs as much as the churn rather than the table.
+    cache = st.session_state.setdefault("customer_cache", {"watermark": None, "rows": {}})
     try:
-        r = requests.get(f"{BASE_URL}/customers", timeout=10)
+        params = {"since": cache["watermark"]} if cache["watermark"] else {}
+        r = requests.get(f"{BASE_URL}/customers/changes", params=params, timeout=10)
         r.raise_for_status()
-        return r.json()
+        delta = r.json()
+        if delta["reset"]:
+            cache["rows"] = {}
+        for c in delta["changed"]:
+            cache["rows"][c["id"]] = c
+        for cid in delta["deleted"]:
+            cache["rows"].pop(cid, None)
+        cache["watermark"] = delta["watermark"]
     except Exception as e:
         st.error(f"Error fetching customers: {e}")
-        return []
+    return [cache["rows"][cid] for cid in sorted(cache["rows"])]
 
 def iso_or_none(dt_str: str):
     if not dt_str:
@@ -88,6 +88,45 @@ def make_api_request(endpoint, method="GET", data=None, token=None):
         st.error(f"Error: {str(e)}")
         return None
 
+def stream_api_request(endpoint, data=None, token=None):
+    """POST to a Server-Sent Events endpoint and yield the text pieces as they arrive"""
+    try:
+        headers = {"Accept": "text/event-stream"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        
+        with requests.post(f"{API_BASE_URL}{endpoint}", json=data, headers=headers, stream=True) as response:
+            if response.status_code != 200:
+                st.error(f"API Error: {response.status_code} - {response.text}")
+                return
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    payload = json.loads(line[len("data: "):])
+                    if event == "error":
+                        st.error(payload.get("detail", "Streaming failed"))
+                        return
+                    if event is None:
+                        yield payload["text"]
+                elif not line:
+                    event = None
+    except requests.exceptions.ConnectionError:
+        st.error("Cannot connect to the API. Please make sure the backend is running.")
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+
+def render_stream(endpoint, data):
+    """Render a streamed answer progressively in one placeholder"""
+    placeholder = st.empty()
+    text = ""
+    for piece in stream_api_request(endpoint, data=data):
+        text += piece
+        placeholder.markdown(text + "▌")
+    placeholder.markdown(text)
+    return text
+
 def login_user(username, password):
     """Login user and store token in session state"""
     data = {"username": username, "password": password}
@@ -365,11 +404,8 @@ def main():
                             "travel_style": travel_style
                         }
                         
-                        with st.spinner("Generating recommendations..."):
-                            response = make_api_request("/recommendations", method="POST", data=data)
-                            if response:
-                                st.markdown("### 🤖 AI Recommendations")
-                                st.markdown(response['recommendations'])
+                        st.markdown("### 🤖 AI Recommendations")
+                        render_stream("/recommendations/stream", data)
             
             # Generate complete itinerary
             st.markdown("---")
@@ -403,11 +439,8 @@ def main():
                             "travel_style": gen_style
                         }
                         
-                        with st.spinner("Generating itinerary..."):
-                            response = make_api_request("/itinerary/generate", method="POST", data=data)
-                            if response:
-                                st.markdown("### 📅 Generated Itinerary")
-                                st.markdown(response['itinerary'])
+                        st.markdown("### 📅 Generated Itinerary")
+                        render_stream("/itinerary/generate/stream", data)
         
         with tab5:
             st.markdown('<h2 class="section-header">Reviews</h2>', unsafe_allow_html=True)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Catalog read throughput benchmark for the Travel Planner API
+
+Serves GET /destinations and GET /hotels in-process (TestClient) against a
+copy of data/ with the hotels table scaled up, once with every request
+re-reading its CSV (the old load_csv behaviour, forced by invalidating the
+repository) and once served from the in-memory repository.
+
+Usage:
+    python bench_catalog.py [--hotels 500] [--requests 300]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _prepare_data(hotels: int) -> str:
+    data_dir = os.path.join(tempfile.mkdtemp(prefix="travel-bench-"), "data")
+    shutil.copytree(os.path.join(HERE, "data"), data_dir)
+    base = pd.read_csv(os.path.join(data_dir, "hotels.csv"))
+    scaled = pd.concat([base] * (hotels // len(base) + 1), ignore_index=True).head(hotels)
+    scaled["hotel_id"] = range(1, len(scaled) + 1)
+    scaled.to_csv(os.path.join(data_dir, "hotels.csv"), index=False)
+    return data_dir
+
+
+def _run(client, repo, path: str, requests: int, cold: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        if cold:
+            repo.invalidate()
+        response = client.get(path)
+        assert response.status_code == 200, response.text
+    return requests / (time.perf_counter() - start)
+
+
+def main(args):
+    os.environ["TRAVEL_DATA_DIR"] = _prepare_data(args.hotels)
+    sys.path.insert(0, HERE)
+    from fastapi.testclient import TestClient
+    import main as app_module
+
+    print(f"🏨 {args.hotels} hotels, {args.requests} requests per endpoint")
+    with TestClient(app_module.app) as client:
+        for path in ("/destinations", "/hotels", "/hotels?destination_id=1"):
+            before = _run(client, app_module.repo, path, args.requests, cold=True)
+            after = _run(client, app_module.repo, path, args.requests, cold=False)
+            print(f"  {path:<26} read_csv per request {before:>8.1f} req/s   in-memory {after:>8.1f} req/s   ({after / before:.1f}x)")
+    shutil.rmtree(os.path.dirname(os.environ["TRAVEL_DATA_DIR"]), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=300)
+    main(parser.parse_args())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Concurrent-client latency benchmark for the Travel Planner API
+
+Starts the API with uvicorn on a local port (against a scratch copy of data/
+with the reviews table scaled up) and drives it with N parallel clients. Each
+client sends a mix of GET /destinations, GET /reviews?destination_id=... and
+authenticated POST /reviews, so reads keep racing CSV appends and re-reads.
+Every client count runs twice: storage calls made inline on the event loop
+(the previous behaviour, patched in for comparison) and through the storage
+executor. Latencies are per request, measured at the client.
+
+Usage:
+    python bench_concurrency.py [--clients 100,250,500] [--requests 10] [--reviews 50000] [--port 8766]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _prepare_data(reviews: int) -> str:
+    data_dir = os.path.join(tempfile.mkdtemp(prefix="travel-bench-"), "data")
+    shutil.copytree(os.path.join(HERE, "data"), data_dir)
+    pd.DataFrame({
+        "review_id": range(1, reviews + 1),
+        "user_id": [i % 8 + 1 for i in range(reviews)],
+        "destination_id": [i % 8 + 1 for i in range(reviews)],
+        "rating": [i % 5 + 1 for i in range(reviews)],
+        "comment": [f"Benchmark review {i}" for i in range(reviews)],
+        "created_at": "2024-01-01",
+    }).to_csv(os.path.join(data_dir, "reviews.csv"), index=False)
+    return data_dir
+
+
+def _start_server(app, port: int):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                                           backlog=2048, limit_concurrency=4096, timeout_keep_alive=120))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def _pct(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def _run_clients(base_url: str, token: str, clients: int, requests: int):
+    latencies = {"GET /destinations": [], "GET /reviews": [], "POST /reviews": []}
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async def client_loop(client, n: int):
+        for i in range(requests):
+            kind = (n + i) % 10
+            start = time.perf_counter()
+            if kind == 0:
+                label = "POST /reviews"
+                r = await client.post("/reviews", headers=headers,
+                                      json={"destination_id": n % 8 + 1, "rating": 5, "comment": "bench"})
+            elif kind < 3:
+                label = "GET /reviews"
+                r = await client.get("/reviews", params={"destination_id": n % 8 + 1})
+            else:
+                label = "GET /destinations"
+                r = await client.get("/destinations")
+            latencies[label].append((time.perf_counter() - start) * 1000)
+            assert r.status_code == 200, r.text
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[client_loop(client, n) for n in range(clients)])
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def main(args):
+    os.environ["TRAVEL_DATA_DIR"] = _prepare_data(args.reviews)
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")  # only one login here; keep setup quick
+    sys.path.insert(0, HERE)
+    import main as app_module
+
+    server, thread = _start_server(app_module.app, args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    creds = {"username": "bench_user", "email": "bench@example.com", "password": "bench-password"}
+    httpx.post(f"{base_url}/auth/register", json=creds, timeout=60)
+    token = httpx.post(f"{base_url}/auth/login", json=creds, timeout=60).json()["access_token"]
+
+    executor_run_storage = app_module.run_storage
+
+    async def inline_run_storage(fn, *fn_args):
+        return fn(*fn_args)
+
+    print(f"🧵 {args.reviews} reviews, {args.requests} requests per client (10% POST /reviews)")
+    for clients in args.clients:
+        for label, runner in (("inline", inline_run_storage), ("executor", executor_run_storage)):
+            app_module.run_storage = runner
+            latencies, elapsed = asyncio.run(_run_clients(base_url, token, clients, args.requests))
+            everything = [ms for values in latencies.values() for ms in values]
+            cheap = latencies["GET /destinations"]
+            print(f"  {clients:>4} clients {label:<9} {len(everything) / elapsed:>7.1f} req/s"
+                  f"   all p50 {statistics.median(everything):>8.1f} ms p99 {_pct(everything, 99):>8.1f} ms"
+                  f"   /destinations p99 {_pct(cheap, 99):>8.1f} ms")
+
+    server.should_exit = True
+    thread.join()
+    shutil.rmtree(os.path.dirname(os.environ["TRAVEL_DATA_DIR"]), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=lambda v: [int(x) for x in v.split(",")], default=[100, 250, 500])
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--reviews", type=int, default=50000)
+    parser.add_argument("--port", type=int, default=8766)
+    main(parser.parse_args())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Hotel search benchmark for the Travel Planner API
+
+Builds a hotels table of --hotels rows and times GET /hotels/search queries
+two ways:
+
+- pandas: boolean masks over the whole DataFrame, sort_values, head(limit)
+  and JSON for the result (what the endpoint would do without an index)
+- index: main.hotel_index.search (sorted price slices per destination,
+  amenity bitmaps, pre-serialized rows)
+
+Every query's results are checked to be identical before timing.
+
+Usage:
+    python bench_hotel_search.py [--hotels 100000] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+AMENITIES = ["WiFi", "Parking", "Restaurant", "Spa", "Pool", "Gym", "Bar", "Luxury", "Boutique"]
+
+QUERIES = {
+    "destination, price range": dict(destination_id=3, min_price=100, max_price=300),
+    "destination, rating, amenities": dict(destination_id=5, min_rating=4, amenities=["WiFi", "Spa"]),
+    "all, price range, by rating": dict(min_price=200, max_price=400, sort="rating_desc"),
+    "all, amenities, most expensive": dict(amenities=["Pool", "Gym"], sort="price_desc"),
+    "all, no filters": dict(),
+    "all, every filter, by rating": dict(min_price=100, max_price=900, min_rating=3,
+                                         amenities=["WiFi", "Restaurant"], sort="rating_desc"),
+}
+
+
+def _hotels(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "hotel_id": range(1, n + 1),
+        "destination_id": [i % 8 + 1 for i in range(n)],
+        "name": [f"Hotel {i}" for i in range(n)],
+        "price_per_night": [50 + (i * 37) % 950 for i in range(n)],
+        "rating": [i % 5 + 1 for i in range(n)],
+        "availability": ["Available" if i % 7 else "Limited" for i in range(n)],
+        "amenities": [",".join(AMENITIES[j] for j in range(9) if (i >> j) & 1) or "WiFi" for i in range(n)],
+    })
+
+
+def _pandas_search(app_module, df, destination_id=None, min_price=None, max_price=None, min_rating=None,
+                   amenities=None, sort="price_asc", limit=20) -> bytes:
+    mask = pd.Series(True, index=df.index)
+    if destination_id is not None:
+        mask &= df['destination_id'] == destination_id
+    if min_price is not None:
+        mask &= df['price_per_night'] >= min_price
+    if max_price is not None:
+        mask &= df['price_per_night'] <= max_price
+    if min_rating is not None:
+        mask &= df['rating'] >= min_rating
+    for amenity in amenities or []:
+        mask &= df['amenities'].str.contains(rf"(?:^|,)\s*{re.escape(amenity)}\s*(?:,|$)", case=False, regex=True)
+    rows = df[mask]
+    if sort == "price_asc":
+        rows = rows.sort_values('price_per_night', kind="stable")
+    elif sort == "price_desc":
+        rows = rows.sort_values('price_per_night', kind="stable").iloc[::-1]
+    else:
+        rows = rows.sort_values('price_per_night', kind="stable").sort_values('rating', ascending=False, kind="stable")
+    return app_module.frame_to_json(rows.head(limit), app_module.Hotel)
+
+
+def _timings(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main(args):
+    data_dir = tempfile.mkdtemp(prefix="travel-bench-")
+    os.environ["TRAVEL_DATA_DIR"] = data_dir
+    _hotels(args.hotels).to_csv(os.path.join(data_dir, "hotels.csv"), index=False)
+
+    sys.path.insert(0, HERE)
+    import main as app_module
+
+    df = app_module.repo.table("hotels")
+    start = time.perf_counter()
+    app_module.hotel_index.refresh()
+    print(f"🔎 {args.hotels} hotels, index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    pandas_repeat = max(3, args.repeat // 20)
+    for label, query in QUERIES.items():
+        indexed = app_module.hotel_index.search(**query)
+        expected = _pandas_search(app_module, df, **query)
+        assert json.loads(indexed) == json.loads(expected), label
+        pandas_p50, _ = _timings(lambda: _pandas_search(app_module, df, **query), pandas_repeat)
+        index_p50, index_p99 = _timings(lambda: app_module.hotel_index.search(**query), args.repeat)
+        print(f"  {label:<32} pandas {pandas_p50 / 1000:>8.2f} ms   index p50 {index_p50:>7.1f} µs"
+              f"  p99 {index_p99:>7.1f} µs   ({pandas_p50 / index_p50:.0f}x)")
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Login-storm benchmark for the Travel Planner API
+
+Starts the API with uvicorn on a local port (against a scratch copy of data/),
+then fires --logins concurrent logins while a probe client keeps requesting
+GET /destinations. It runs twice: once with bcrypt verification on the event
+loop (the previous behaviour, patched in for comparison) and once through the
+password pool, and prints the probe's latency for each run.
+
+Usage:
+    python bench_login_storm.py [--logins 40] [--port 8765] [--rounds 12]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+USERNAME = "storm_user"
+PASSWORD = "storm-password"
+
+
+def _start_server(app, port: int):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def _pct(values, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def _storm(base_url: str, logins: int):
+    probe_ms = []
+    done = asyncio.Event()
+
+    async def probe(client):
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/destinations")
+            probe_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        probe_task = asyncio.create_task(probe(client))
+        await asyncio.sleep(0.3)  # baseline samples before the storm
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            client.post("/auth/login", json={"username": USERNAME, "password": PASSWORD})
+            for _ in range(logins)
+        ])
+        storm_sec = time.perf_counter() - start
+        done.set()
+        await probe_task
+    assert all(r.status_code == 200 for r in results), [r.text for r in results if r.status_code != 200][:1]
+    return probe_ms, storm_sec
+
+
+def main(args):
+    data_dir = os.path.join(tempfile.mkdtemp(prefix="travel-bench-"), "data")
+    shutil.copytree(os.path.join(HERE, "data"), data_dir)
+    os.environ["TRAVEL_DATA_DIR"] = data_dir
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    sys.path.insert(0, HERE)
+    import main as app_module
+
+    server, thread = _start_server(app_module.app, args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    httpx.post(f"{base_url}/auth/register", json={"username": USERNAME, "email": "storm@example.com", "password": PASSWORD}, timeout=60)
+
+    pooled_verify = app_module.verify_password
+
+    async def verify_on_loop(plain_password, hashed_password):
+        return app_module.pwd_context.verify(plain_password, hashed_password)
+
+    print(f"🔐 {args.logins} concurrent logins at bcrypt cost {args.rounds}, probing GET /destinations")
+    for label, verify in (("on event loop", verify_on_loop), ("password pool", pooled_verify)):
+        app_module.verify_password = verify
+        probe_ms, storm_sec = asyncio.run(_storm(base_url, args.logins))
+        print(f"  {label:<14} logins {storm_sec:>6.2f}s   probe p50 {statistics.median(probe_ms):>7.1f} ms"
+              f"   p99 {_pct(probe_ms, 99):>7.1f} ms   max {max(probe_ms):>7.1f} ms   ({len(probe_ms)} probes)")
+
+    server.should_exit = True
+    thread.join()
+    shutil.rmtree(os.path.dirname(data_dir), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rounds", type=int, default=12)
+    main(parser.parse_args())
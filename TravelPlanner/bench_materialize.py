@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Hotel list materialization benchmark for the Travel Planner API
+
+Builds a hotels table of --hotels rows and times turning it into the JSON
+body of GET /hotels three ways:
+
+- iterrows: the old path, Hotel(**row) per row, then response_model
+  validation and JSON encoding of the list
+- column-wise: main.frame_to_json (one to_json call over the columns)
+- cached: main.list_json for an unchanged table (pre-serialized bytes)
+
+Usage:
+    python bench_materialize.py [--hotels 100000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import List
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+AMENITIES = ["WiFi", "Parking", "Restaurant", "Spa", "Pool", "Gym", "Bar", "Luxury", "Boutique"]
+
+
+def _hotels(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "hotel_id": range(1, n + 1),
+        "destination_id": [i % 8 + 1 for i in range(n)],
+        "name": [f"Hotel {i}" for i in range(n)],
+        "price_per_night": [50 + (i * 37) % 950 for i in range(n)],
+        "rating": [i % 5 + 1 for i in range(n)],
+        "availability": ["Available" if i % 7 else "Limited" for i in range(n)],
+        "amenities": [",".join(AMENITIES[j] for j in range(9) if (i >> j) & 1) or "WiFi" for i in range(n)],
+    })
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(args):
+    data_dir = tempfile.mkdtemp(prefix="travel-bench-")
+    os.environ["TRAVEL_DATA_DIR"] = data_dir
+    hotels = _hotels(args.hotels)
+    hotels.to_csv(os.path.join(data_dir, "hotels.csv"), index=False)
+
+    sys.path.insert(0, HERE)
+    from pydantic import TypeAdapter
+    import main as app_module
+
+    hotels = app_module.repo.table("hotels")
+    adapter = TypeAdapter(List[app_module.Hotel])
+
+    def iterrows():
+        models = [app_module.Hotel(**row) for _, row in hotels.iterrows()]
+        return adapter.dump_json(adapter.validate_python(models))
+
+    def column_wise():
+        return app_module.frame_to_json(hotels, app_module.Hotel)
+
+    def cached():
+        return app_module.list_json("hotels", app_module.Hotel)
+
+    assert json.loads(iterrows()) == json.loads(column_wise()) == json.loads(cached())
+    print(f"🏨 {args.hotels} hotels, best of {args.repeat}")
+    results = {}
+    for label, fn in (("iterrows", iterrows), ("column-wise", column_wise), ("cached", cached)):
+        results[label] = _best_of(fn, args.repeat)
+        print(f"  {label:<12} {results[label] * 1000:>10.3f} ms "
+              f"({results['iterrows'] / results[label]:.0f}x vs iterrows)")
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
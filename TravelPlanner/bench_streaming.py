@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-byte benchmark for the streaming LLM endpoints
+
+Starts a local mock of Groq's OpenAI-compatible completion endpoint that
+produces --tokens tokens, one every --token-delay seconds (as SSE chunks when
+asked to stream, as one body after the last token otherwise), points the API
+at it through GROQ_BASE_URL and compares, per endpoint:
+
+- POST /recommendations and /itinerary/generate: first byte = whole answer
+- POST /recommendations/stream and /itinerary/generate/stream: first text
+  event, and the time until the "done" event
+
+The answer cache is cleared before every request so each one reaches the
+mock model. Runs against a scratch copy of data/.
+
+Usage:
+    python bench_streaming.py [--tokens 200] [--token-delay 0.01] [--runs 5] [--port 8769] [--mock-port 8770]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _mock_groq(tokens: int, token_delay: float) -> FastAPI:
+    mock = FastAPI()
+    words = [f"word{i} " for i in range(tokens)]
+
+    def chunk(body, delta, finish_reason=None):
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    @mock.post("/openai/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        if not body.get("stream"):
+            await asyncio.sleep(tokens * token_delay)
+            return {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(words)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": tokens, "total_tokens": tokens + 1},
+            }
+
+        async def events():
+            yield f"data: {json.dumps(chunk(body, {'role': 'assistant', 'content': ''}))}\n\n"
+            for word in words:
+                await asyncio.sleep(token_delay)
+                yield f"data: {json.dumps(chunk(body, {'content': word}))}\n\n"
+            yield f"data: {json.dumps(chunk(body, {}, 'stop'))}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return mock
+
+
+def _start_server(app, port: int):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+async def _plain(client, path: str, payload: dict):
+    start = time.perf_counter()
+    r = await client.post(path, json=payload)
+    elapsed = time.perf_counter() - start
+    assert r.status_code == 200, r.text
+    return elapsed, elapsed, len(next(iter(r.json().values())))
+
+
+async def _streamed(client, path: str, payload: dict):
+    start = time.perf_counter()
+    first = None
+    text = []
+    async with client.stream("POST", path, json=payload) as r:
+        assert r.status_code == 200
+        event = None
+        async for line in r.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+                if event is None:
+                    if first is None:
+                        first = time.perf_counter() - start
+                    text.append(data["text"])
+                assert event != "error", data
+            elif not line:
+                event = None
+    return first, time.perf_counter() - start, len("".join(text))
+
+
+async def _run(base_url: str, app_module, runs: int):
+    payload = {"destination_id": 1, "budget": 2000, "duration": 5, "interests": ["Culture"]}
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        for path, fn in (("/recommendations", _plain), ("/recommendations/stream", _streamed),
+                         ("/itinerary/generate", _plain), ("/itinerary/generate/stream", _streamed)):
+            samples = []
+            for _ in range(runs):
+                app_module.llm_cache.clear()
+                samples.append(await fn(client, path, payload))
+            results[path] = samples
+    return results
+
+
+def main(args):
+    data_dir = os.path.join(tempfile.mkdtemp(prefix="travel-bench-"), "data")
+    shutil.copytree(os.path.join(HERE, "data"), data_dir)
+    os.environ["TRAVEL_DATA_DIR"] = data_dir
+    os.environ["GROQ_API_KEY"] = "bench-key"
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}"
+    sys.path.insert(0, HERE)
+    import main as app_module
+
+    mock_server, mock_thread = _start_server(_mock_groq(args.tokens, args.token_delay), args.mock_port)
+    server, thread = _start_server(app_module.app, args.port)
+
+    print(f"📡 Mock model: {args.tokens} tokens at {args.token_delay * 1000:.0f} ms/token, median of {args.runs} runs")
+    results = asyncio.run(_run(f"http://127.0.0.1:{args.port}", app_module, args.runs))
+    for path, samples in results.items():
+        ttfb = statistics.median(s[0] for s in samples) * 1000
+        total = statistics.median(s[1] for s in samples) * 1000
+        chars = samples[0][2]
+        print(f"  {path:<28} first text {ttfb:>8.1f} ms   complete {total:>8.1f} ms   ({chars} chars)")
+
+    server.should_exit = True
+    mock_server.should_exit = True
+    thread.join()
+    mock_thread.join()
+    shutil.rmtree(os.path.dirname(data_dir), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8769)
+    parser.add_argument("--mock-port", type=int, default=8770)
+    main(parser.parse_args())
@@ -5,12 +5,45 @@ load_dotenv()
 
 # API Configuration
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "your_groq_api_key_here")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama3-8b-8192")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None  # None = Groq's public API
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))  # seconds per completion
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+
+# Catalog data allowed in an /itinerary/generate prompt (approximate tokens);
+# the instructions and the 1000-token answer come on top of this
+ITINERARY_PROMPT_TOKENS = int(os.getenv("ITINERARY_PROMPT_TOKENS", "1500"))
+
+# Cache of /recommendations and /itinerary/generate answers: entries, seconds
+# an answer is reused, and the budget step requests are bucketed by (budgets
+# in the same step share an answer)
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_BUDGET_STEP = int(os.getenv("LLM_CACHE_BUDGET_STEP", "250"))
+
+# Analytics rows are queued and appended in batches by a background task:
+# most rows per write, seconds a partial batch may wait, how many rows may be
+# queued before new ones are dropped, and how many times a failing batch is
+# written (backing off from the flush interval, doubling) before it is dropped
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "100"))
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "0.5"))
+ANALYTICS_QUEUE_SIZE = int(os.getenv("ANALYTICS_QUEUE_SIZE", "10000"))
+ANALYTICS_MAX_ATTEMPTS = int(os.getenv("ANALYTICS_MAX_ATTEMPTS", "5"))
+
 SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key_here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Password hashing: bcrypt cost (new hashes only; existing ones keep theirs),
+# worker threads, and how many hash/verify calls may be queued or running
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "32"))
+
 # File paths
-DATA_DIR = "data"
+DATA_DIR = os.getenv("TRAVEL_DATA_DIR", "data")
 USERS_FILE = f"{DATA_DIR}/users.csv"
 DESTINATIONS_FILE = f"{DATA_DIR}/destinations.csv"
 HOTELS_FILE = f"{DATA_DIR}/hotels.csv"
@@ -18,3 +51,23 @@ ACTIVITIES_FILE = f"{DATA_DIR}/activities.csv"
 ITINERARIES_FILE = f"{DATA_DIR}/itineraries.csv"
 REVIEWS_FILE = f"{DATA_DIR}/reviews.csv"
 ANALYTICS_FILE = f"{DATA_DIR}/analytics.csv"
+TABLE_FILES = {
+    "users": USERS_FILE,
+    "destinations": DESTINATIONS_FILE,
+    "hotels": HOTELS_FILE,
+    "activities": ACTIVITIES_FILE,
+    "itineraries": ITINERARIES_FILE,
+    "reviews": REVIEWS_FILE,
+    "analytics": ANALYTICS_FILE,
+}
+
+# Storage backend: "csv" (the files above) or "sqlite" (SQLITE_FILE, created
+# from the CSV files on first start; see migrate_to_sqlite.py)
+STORAGE_BACKEND = os.getenv("TRAVEL_STORAGE", "csv")
+SQLITE_FILE = os.getenv("TRAVEL_SQLITE_FILE", f"{DATA_DIR}/travel.db")
+
+# Threads serving storage calls for the async endpoints
+STORAGE_WORKERS = int(os.getenv("STORAGE_WORKERS", "8"))
+
+# Rewrite a CSV table in one piece after this many appended rows
+CSV_COMPACT_EVERY = int(os.getenv("CSV_COMPACT_EVERY", "1000"))
@@ -0,0 +1,179 @@
+"""
+Indexed hotel search for GET /hotels/search.
+
+HotelSearchIndex builds a HotelSnapshot from the hotels table, and a new one
+whenever repo.version("hotels") changes. A snapshot holds:
+
+- row positions sorted by price_per_night, for all hotels and per
+  destination, with the matching sorted price arrays: a price range is two
+  searchsorted calls that give a contiguous slice of candidates
+- the same price-ordered arrays split by rating level, for rating_desc
+- an inverted index from amenity (lower-cased, from the comma-separated
+  `amenities` field) to a boolean bitmap over the hotels
+- every hotel pre-serialized as JSON (byte for byte what GET /hotels
+  returns for it), so a response is a join of bytes
+
+search() slices the price range, walks it in the requested order applying
+the rating and amenity bitmaps a chunk at a time until it has `limit` rows,
+and serializes only those rows.
+"""
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SORT_ORDERS = ("price_asc", "price_desc", "rating_desc")
+
+
+class HotelSnapshot:
+    """One immutable build of the hotel search arrays (see module docstring).
+
+    HotelSearchIndex swaps in a whole new snapshot when the table changes, so
+    a search that holds one never mixes positions from two builds.
+    """
+
+    __slots__ = ("rating", "by_price", "by_rating", "amenities", "rows_json")
+
+    def __init__(self, rating: np.ndarray = None,
+                 by_price: Dict[Optional[int], Tuple[np.ndarray, np.ndarray]] = None,
+                 by_rating: Dict[Optional[int], List[Tuple[int, np.ndarray, np.ndarray]]] = None,
+                 amenities: Dict[str, np.ndarray] = None, rows_json: List[bytes] = None):
+        self.rating = rating if rating is not None else np.empty(0, dtype=np.int16)
+        # destination_id (None = all hotels) -> (positions by price, their prices)
+        self.by_price = by_price or {}
+        # destination_id (None = all) -> [(rating, positions by price, prices)], best rating first
+        self.by_rating = by_rating or {}
+        self.amenities = amenities or {}
+        self.rows_json = rows_json or []
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, serialize: Callable[[pd.DataFrame], bytes]) -> "HotelSnapshot":
+        if df.empty:
+            return cls()
+        df = df.reset_index(drop=True)
+        price = df['price_per_night'].to_numpy(dtype=float)
+        destination = df['destination_id'].to_numpy(dtype=np.int64)
+        rating = df['rating'].fillna(0).to_numpy(dtype=np.int16)
+
+        def groups(positions: np.ndarray, keys: np.ndarray):
+            """positions split by key; a stable sort keeps each group in price order"""
+            grouped = positions[np.argsort(keys[positions], kind="stable")]
+            bounds = np.flatnonzero(np.diff(keys[grouped])) + 1
+            return [(int(keys[part[0]]), part) for part in np.split(grouped, bounds) if len(part)]
+
+        everything = np.argsort(price, kind="stable")
+        by_price = {None: (everything, price[everything])}
+        for dest, positions in groups(everything, destination):
+            by_price[dest] = (positions, price[positions])
+        by_rating = {}
+        for dest, (positions, _) in by_price.items():
+            levels = groups(positions, rating)
+            by_rating[dest] = [(level, part, price[part]) for level, part in reversed(levels)]
+
+        amenities: Dict[str, np.ndarray] = {}
+        for position, field in enumerate(df['amenities'].fillna("").astype(str)):
+            for amenity in field.split(","):
+                amenity = amenity.strip().lower()
+                if amenity:
+                    bitmap = amenities.get(amenity)
+                    if bitmap is None:
+                        bitmap = amenities[amenity] = np.zeros(len(df), dtype=bool)
+                    bitmap[position] = True
+
+        # One line per hotel, in df order: the same bytes GET /hotels returns
+        rows_json = serialize(df).rstrip(b"\n").split(b"\n")
+        return cls(rating, by_price, by_rating, amenities, rows_json)
+
+
+class HotelSearchIndex:
+    """Price / rating / amenity search over the hotels table (see module docstring)"""
+
+    def __init__(self, repository, serialize: Callable[[pd.DataFrame], bytes]):
+        self._repo = repository
+        self._serialize = serialize  # frame -> one JSON object per line, as GET /hotels renders each hotel
+        self._version = None
+        self._lock = threading.Lock()
+        self._snapshot = HotelSnapshot()
+
+    def snapshot(self) -> HotelSnapshot:
+        """The up-to-date arrays; a search uses the returned object throughout"""
+        version = self._repo.version("hotels")
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._snapshot = HotelSnapshot.build(self._repo.table("hotels"), self._serialize)
+                    self._version = version
+        return self._snapshot
+
+    def refresh(self) -> None:
+        self.snapshot()
+
+    @staticmethod
+    def _price_slice(positions: np.ndarray, prices: np.ndarray, min_price: Optional[float],
+                     max_price: Optional[float]) -> np.ndarray:
+        lo = 0 if min_price is None else int(np.searchsorted(prices, min_price, side="left"))
+        hi = len(prices) if max_price is None else int(np.searchsorted(prices, max_price, side="right"))
+        return positions[lo:hi]
+
+    @staticmethod
+    def _first_matches(rating: np.ndarray, candidates: np.ndarray, min_rating: Optional[int],
+                       bitmaps: List[np.ndarray], limit: int) -> np.ndarray:
+        """The first `limit` candidates passing the filters, in candidate order.
+
+        Checks a growing chunk at a time and stops once `limit` are found, so
+        broad queries don't mask every hotel to return a page of 20.
+        """
+        if min_rating is None and not bitmaps:
+            return candidates[:limit]
+        found = []
+        count = 0
+        start, chunk = 0, max(256, limit * 16)
+        while start < len(candidates) and count < limit:
+            part = candidates[start:start + chunk]
+            mask = rating[part] >= min_rating if min_rating is not None else None
+            for bitmap in bitmaps:
+                mask = bitmap[part] if mask is None else mask & bitmap[part]
+            hits = part[mask]
+            found.append(hits)
+            count += len(hits)
+            start += chunk
+            chunk *= 4
+        return np.concatenate(found)[:limit] if found else candidates[:0]
+
+    def search(self, destination_id: Optional[int] = None, min_price: Optional[float] = None,
+               max_price: Optional[float] = None, min_rating: Optional[int] = None,
+               amenities: Optional[List[str]] = None, sort: str = "price_asc", limit: int = 20) -> bytes:
+        """JSON array of the matching hotels (at most `limit`)"""
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_ORDERS)}")
+        snapshot = self.snapshot()
+        if destination_id not in snapshot.by_price:
+            return b"[]"
+        bitmaps = []
+        for amenity in amenities or []:
+            bitmap = snapshot.amenities.get(amenity.strip().lower())
+            if bitmap is None:
+                return b"[]"
+            bitmaps.append(bitmap)
+
+        if sort == "rating_desc":
+            # One price-ordered list per rating level, best level first
+            chosen = []
+            remaining = limit
+            for level, positions, prices in snapshot.by_rating[destination_id]:
+                if remaining <= 0 or (min_rating is not None and level < min_rating):
+                    break
+                candidates = self._price_slice(positions, prices, min_price, max_price)
+                hits = self._first_matches(snapshot.rating, candidates, None, bitmaps, remaining)
+                chosen.append(hits)
+                remaining -= len(hits)
+            chosen = np.concatenate(chosen) if chosen else np.empty(0, dtype=np.int64)
+        else:
+            candidates = self._price_slice(*snapshot.by_price[destination_id], min_price, max_price)
+            if sort == "price_desc":
+                candidates = candidates[::-1]
+            chosen = self._first_matches(snapshot.rating, candidates, min_rating, bitmaps, limit)
+
+        rows = snapshot.rows_json
+        return b"[" + b",".join([rows[p] for p in chosen.tolist()]) + b"]"
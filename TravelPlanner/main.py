@@ -1,8 +1,9 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Type, AsyncIterator
 import pandas as pd
 import json
 import hashlib
@@ -10,16 +11,34 @@ import secrets
 from datetime import datetime, timedelta
 import jwt
 from passlib.context import CryptContext
-import os
+import sys
+import threading
+import asyncio
+import functools
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 try:
-    from groq import Groq
+    from groq import AsyncGroq
 except ImportError:
-    Groq = None
+    AsyncGroq = None
 import config
 
+# Modules shared with the other apps live in ../common
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from common.compression import CompressionMiddleware
+from repository import DuplicateRowError, create_repository
+from hotel_search import SORT_ORDERS, HotelSearchIndex
+from retrieval import CATALOG_TABLES, CatalogIndex, budgeted_tables, count_tokens, format_table
+
 # Initialize FastAPI app
 app = FastAPI(title="Travel Planner API", version="1.0.0")
 
+logger = logging.getLogger("travel_planner")
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,11 +48,234 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated zstd/gzip for the catalog list endpoints (see common/compression.py)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # Security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.BCRYPT_ROUNDS)
 security = HTTPBearer()
 
-# Groq client will be initialized when needed
+# bcrypt is deliberately slow (~250 ms at cost 12), so hashing and verifying
+# run on a small dedicated thread pool (bcrypt releases the GIL) and at most
+# PASSWORD_HASH_CONCURRENCY of them are queued or running at once. The event
+# loop keeps serving other requests meanwhile.
+_password_executor = ThreadPoolExecutor(max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_password_slots: Optional[asyncio.Semaphore] = None
+
+def _password_slot() -> asyncio.Semaphore:
+    # Created on first use so it belongs to the server's running loop
+    global _password_slots
+    if _password_slots is None:
+        _password_slots = asyncio.Semaphore(config.PASSWORD_HASH_CONCURRENCY)
+    return _password_slots
+
+# One Groq client for the whole app, created at startup: its pooled HTTP
+# connections are reused across requests and every completion is awaited
+# with a timeout instead of blocking the event loop.
+groq_client = None
+
+@app.on_event("startup")
+async def start_groq_client():
+    global groq_client
+    if AsyncGroq is None or config.GROQ_API_KEY == "your_groq_api_key_here":
+        return
+    timeout = httpx.Timeout(config.GROQ_TIMEOUT, connect=config.GROQ_CONNECT_TIMEOUT)
+    groq_client = AsyncGroq(
+        api_key=config.GROQ_API_KEY,
+        base_url=config.GROQ_BASE_URL,
+        timeout=timeout,
+        max_retries=config.GROQ_MAX_RETRIES,
+        http_client=httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=config.GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=config.GROQ_MAX_CONNECTIONS,
+            ),
+        ),
+    )
+
+@app.on_event("shutdown")
+async def stop_groq_client():
+    global groq_client
+    if groq_client is not None:
+        await groq_client.close()
+        groq_client = None
+
+# Tables live in the CSV files under data/ (served from memory, inserts
+# appended under a file lock) or in SQLite, per config.STORAGE_BACKEND
+# (see repository.py)
+repo = create_repository(config.STORAGE_BACKEND, config.TABLE_FILES, config.SQLITE_FILE,
+                         compact_every=config.CSV_COMPACT_EVERY)
+
+@app.on_event("startup")
+async def load_tables():
+    await run_storage(repo.load_all)
+
+# Storage calls (file stats and reads, CSV appends, SQLite queries and the
+# DataFrame work around them) run on their own executor, so disk I/O in one
+# request never holds up the event loop for the others.
+_storage_executor = ThreadPoolExecutor(max_workers=config.STORAGE_WORKERS, thread_name_prefix="storage")
+
+async def run_storage(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_storage_executor, functools.partial(fn, *args))
+
+class AnalyticsWriter:
+    """Appends analytics rows from a background task, in batches.
+
+    record() only queues the row, so request handlers never wait on
+    analytics.csv; while the writer is not running (no startup hook, or after
+    stop()) it writes the row directly instead. The drain task collects up to ANALYTICS_BATCH_SIZE rows
+    (or whatever arrived within ANALYTICS_FLUSH_INTERVAL) and writes them
+    with one insert_many, which allocates their analytics_ids. A failed write
+    is logged and retried after flush_interval, doubling the wait each time;
+    after max_attempts the batch is dropped. stop() flushes everything still
+    queued. stats() reports how many rows were dropped (queue full or write
+    given up) and how many writes failed.
+    """
+
+    def __init__(self, repository, batch_size: int, flush_interval: float, max_queued: int,
+                 max_attempts: int):
+        self._repo = repository
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.dropped = 0
+        self.failed_writes = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._writing: Optional[asyncio.Future] = None
+        self._unwritten: List[Dict[str, Any]] = []
+
+    def record(self, type_: str, entity_id: int, insight_text: str) -> None:
+        """Queue one analytics row (stamped now); never blocks while running"""
+        row = {
+            'type': type_,
+            'entity_id': entity_id,
+            'insight_text': insight_text,
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        if self._task is None:
+            try:
+                self._write([row])
+            except Exception:
+                self._give_up([row])
+            return
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            if not self.dropped:
+                logger.warning("analytics queue full (%d rows), dropping new rows", self.max_queued)
+            self.dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() + len(self._unwritten) if self._queue is not None else 0,
+            "dropped": self.dropped,
+            "failed_writes": self.failed_writes,
+        }
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._task = asyncio.create_task(self._drain())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._writing is not None:
+            try:
+                await self._writing
+                self._unwritten = []
+            except Exception:
+                pass
+            self._writing = None
+        while not self._queue.empty():
+            self._unwritten.append(self._queue.get_nowait())
+        if self._unwritten:
+            try:
+                await run_storage(self._write, self._unwritten)
+            except Exception:
+                self._give_up(self._unwritten)
+            self._unwritten = []
+
+    async def _next_batch(self) -> None:
+        """Move queued rows into _unwritten: wait for one, then take what
+        arrives until the batch is full or flush_interval has passed"""
+        if not self._unwritten:
+            self._unwritten.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(self._unwritten) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                self._unwritten.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _drain(self) -> None:
+        attempts = 0
+        while True:
+            await self._next_batch()
+            # Shielded so cancelling the task (stop) never abandons a write
+            # halfway; stop() waits for it instead
+            self._writing = asyncio.ensure_future(run_storage(self._write, list(self._unwritten)))
+            try:
+                await asyncio.shield(self._writing)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._writing = None
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    self._give_up(self._unwritten)
+                    self._unwritten = []
+                    attempts = 0
+                    continue
+                delay = self.flush_interval * 2 ** (attempts - 1)
+                logger.warning("analytics write of %d rows failed (attempt %d/%d), retrying in %.2fs",
+                               len(self._unwritten), attempts, self.max_attempts, delay, exc_info=True)
+                await asyncio.sleep(delay)  # keep the rows, retry with the next batch
+                continue
+            self._writing = None
+            self._unwritten = []
+            attempts = 0
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            self._repo.insert_many("analytics", rows)
+        except Exception:
+            self.failed_writes += 1
+            raise
+
+    def _give_up(self, rows: List[Dict[str, Any]]) -> None:
+        self.dropped += len(rows)
+        logger.error("dropping %d analytics rows after a failed write (%d dropped so far)",
+                     len(rows), self.dropped, exc_info=True)
+
+analytics_writer = AnalyticsWriter(repo, config.ANALYTICS_BATCH_SIZE, config.ANALYTICS_FLUSH_INTERVAL,
+                                   config.ANALYTICS_QUEUE_SIZE, config.ANALYTICS_MAX_ATTEMPTS)
+
+@app.on_event("startup")
+async def start_analytics_writer():
+    analytics_writer.start()
+
+@app.on_event("shutdown")
+async def stop_analytics_writer():
+    await analytics_writer.stop()
+
+@app.on_event("shutdown")
+async def stop_executors():
+    _password_executor.shutdown(wait=False)
+    _storage_executor.shutdown(wait=False)
 
 # Pydantic models
 class UserCreate(BaseModel):
@@ -116,24 +358,58 @@ class RecommendationRequest(BaseModel):
     travel_style: Optional[str] = None
 
 # Utility functions
-def load_csv(file_path: str) -> pd.DataFrame:
-    """Load CSV file and return DataFrame"""
-    if not os.path.exists(file_path):
-        return pd.DataFrame()
-    return pd.read_csv(file_path)
 
-def save_csv(df: pd.DataFrame, file_path: str):
-    """Save DataFrame to CSV file"""
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    df.to_csv(file_path, index=False)
+# List responses are serialized column-wise straight from the DataFrame
+# (no per-row iterrows/model construction) and the JSON is kept per table
+# version, so repeated reads of an unchanged table reuse the same bytes.
+_list_json_cache: Dict[tuple, tuple] = {}
+LIST_JSON_CACHE_SIZE = 256
 
-def hash_password(password: str) -> str:
-    """Hash password using bcrypt"""
-    return pwd_context.hash(password)
+def frame_to_json(df: pd.DataFrame, model: Type[BaseModel], lines: bool = False) -> bytes:
+    """Rows of df as a JSON array of `model` objects, with native JSON types.
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    With lines=True the same objects come one per line instead of as an
+    array (JSON strings escape newlines, so each line is exactly one row).
+    """
+    if df.empty:
+        return b"" if lines else b"[]"
+    frame = df[list(model.model_fields)]
+    # int fields read back as float when a column has blanks; keep them ints
+    ints = {
+        name: "Int64" for name, field in model.model_fields.items()
+        if field.annotation is int and frame[name].dtype.kind != "i"
+    }
+    if ints:
+        frame = frame.astype(ints)
+    return frame.to_json(orient="records", force_ascii=False, lines=lines).encode("utf-8")
+
+def list_json(table: str, model: Type[BaseModel], column: Optional[str] = None, value: Any = None) -> bytes:
+    """JSON list of a table (or the rows where column == value)"""
+    key = (table, column, value)
+    version = repo.version(table)
+    cached = _list_json_cache.get(key)
+    if cached is None or cached[0] != version:
+        df = repo.find(table, column, value) if column else repo.table(table)
+        if len(_list_json_cache) >= LIST_JSON_CACHE_SIZE:
+            _list_json_cache.clear()
+        cached = _list_json_cache[key] = (version, frame_to_json(df, model))
+    return cached[1]
+
+async def list_response(table: str, model: Type[BaseModel], column: Optional[str] = None, value: Any = None) -> Response:
+    body = await run_storage(list_json, table, model, column, value)
+    return Response(content=body, media_type="application/json")
+
+async def hash_password(password: str) -> str:
+    """Hash password using bcrypt (on the password pool)"""
+    async with _password_slot():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, pwd_context.hash, password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against hash (on the password pool)"""
+    async with _password_slot():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, pwd_context.verify, plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
@@ -146,8 +422,57 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, config.SECRET_KEY, algorithm=config.ALGORITHM)
     return encoded_jwt
 
+class UserIndex:
+    """In-memory username / email / user_id lookups over the users table.
+
+    Rebuilt from the repository when the users table changes (register calls
+    invalidate() right after inserting), so authenticated requests resolve
+    their user with a dict lookup instead of scanning users.
+    """
+
+    def __init__(self, repository):
+        self._repo = repository
+        self._version = None
+        self._by_username: Dict[str, Dict[str, Any]] = {}
+        self._by_email: Dict[str, Dict[str, Any]] = {}
+        self._by_id: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        version = self._repo.version("users")
+        if version == self._version:
+            return
+        with self._lock:
+            records = self._repo.table("users").to_dict('records')
+            self._by_username = {r['username']: r for r in records}
+            self._by_email = {r['email']: r for r in records}
+            self._by_id = {r['user_id']: r for r in records}
+            self._version = version
+
+    def by_username(self, username: str) -> Optional[Dict[str, Any]]:
+        self._refresh()
+        return self._by_username.get(username)
+
+    def by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        self._refresh()
+        return self._by_email.get(email)
+
+    def by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        self._refresh()
+        return self._by_id.get(user_id)
+
+    def invalidate(self) -> None:
+        self._version = None
+
+user_index = UserIndex(repo)
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    """Get current user from JWT token"""
+    """Get current user from JWT token.
+
+    Tokens from /auth/login carry user_id and role as signed claims; the rest
+    of the profile comes from the in-memory user index. Tokens issued before
+    those claims existed are resolved by username.
+    """
     try:
         payload = jwt.decode(credentials.credentials, config.SECRET_KEY, algorithms=[config.ALGORITHM])
         username: str = payload.get("sub")
@@ -156,47 +481,230 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    users_df = load_csv(config.USERS_FILE)
-    user_data = users_df[users_df['username'] == username]
-    if user_data.empty:
+    user_id = payload.get("user_id")
+    user = user_index.by_id(user_id) if user_id is not None else user_index.by_username(username)
+    if user is None or user['username'] != username:
         raise HTTPException(status_code=401, detail="User not found")
     
-    user = user_data.iloc[0]
     return User(
         user_id=user['user_id'],
         username=user['username'],
         email=user['email'],
-        role=user['role'],
+        role=payload.get("role", user['role']),
         created_at=user['created_at']
     )
 
-def get_groq_recommendations(prompt: str) -> str:
+catalog_index = CatalogIndex(repo)
+
+DESTINATION_COLUMNS = ['destination_id', 'name', 'country', 'climate', 'best_time_to_visit', 'description']
+HOTEL_COLUMNS = ['destination_id', 'name', 'price_per_night', 'rating', 'amenities']
+ACTIVITY_COLUMNS = ['destination_id', 'name', 'category', 'price', 'rating', 'duration']
+REVIEW_COLUMNS = ['destination_id', 'rating', 'comment']
+
+def recommendation_prompt(request: RecommendationRequest) -> str:
+    """Prompt for /recommendations built from the retrieved catalog rows"""
+    selected = catalog_index.retrieve(request.destination_id, request.budget, request.duration, request.interests)
+    max_price = selected['max_price']
+    hotels_heading = f"Hotels up to ${max_price:.0f}/night" if max_price is not None else "Hotels"
+    return f"""
+    Travel Planning Data (catalog rows relevant to this request):
+    
+    Destinations:
+{format_table(selected['destinations'], DESTINATION_COLUMNS)}
+    
+    {hotels_heading}:
+{format_table(selected['hotels'], HOTEL_COLUMNS)}
+    
+    Activities matching interests:
+{format_table(selected['activities'], ACTIVITY_COLUMNS)}
+    
+    Recent reviews:
+{format_table(selected['reviews'], REVIEW_COLUMNS)}
+    
+    User Request:
+    - Destination ID: {request.destination_id}
+    - Budget: {request.budget}
+    - Duration: {request.duration} days
+    - Interests: {request.interests}
+    - Travel Style: {request.travel_style}
+    
+    Please provide personalized travel recommendations including:
+    1. Recommended destinations
+    2. Hotel suggestions within budget
+    3. Activities based on interests
+    4. Sample itinerary
+    5. Travel tips
+    """
+
+# Itinerary prompts drop destination_id from hotel/activity rows: each of
+# those tables sits under a heading naming its destination
+ITINERARY_COLUMNS = {
+    'destinations': ['destination_id', 'name', 'country', 'climate', 'best_time_to_visit', 'description'],
+    'hotels': ['name', 'price_per_night', 'rating', 'amenities'],
+    'activities': ['name', 'category', 'price', 'rating', 'duration'],
+}
+
+def itinerary_prompt(request: RecommendationRequest) -> str:
+    """Prompt for /itinerary/generate with at most ITINERARY_PROMPT_TOKENS of catalog data"""
+    sections = catalog_index.itinerary_sections(request.destination_id, request.budget, request.duration, request.interests)
+    data = budgeted_tables(
+        ((heading, ITINERARY_COLUMNS[table], rows) for table, heading, rows in sections),
+        config.ITINERARY_PROMPT_TOKENS,
+    )
+    
+    # Get destination info
+    destination_info = ""
+    dest = catalog_index.destination(request.destination_id)
+    if dest is not None:
+        destination_info = f"Destination: {dest['name']}, {dest['country']}"
+    
+    return f"""
+    Generate a detailed travel itinerary with the following requirements:
+    
+    {destination_info}
+    Duration: {request.duration} days
+    Budget: ${request.budget}
+    Interests: {request.interests}
+    Travel Style: {request.travel_style}
+    
+    Available data (most relevant first):
+{data}
+    
+    Please provide:
+    1. Day-by-day itinerary
+    2. Hotel recommendations
+    3. Activity suggestions
+    4. Budget breakdown
+    5. Travel tips
+    6. Return the response in JSON format suitable for the itinerary details_json field
+    """
+
+class ResponseCache:
+    """LRU cache of LLM answers with a per-entry TTL.
+
+    Entries belong to one catalog version (repo.version of the catalog
+    tables): the first lookup or store under a new version drops everything
+    cached for the old one.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._version = None
+
+    def _check_version(self, version) -> None:
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: tuple, version) -> Optional[Any]:
+        self._check_version(version)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, version, value: Any) -> None:
+        self._check_version(version)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+llm_cache = ResponseCache(config.LLM_CACHE_SIZE, config.LLM_CACHE_TTL)
+
+def llm_cache_key(kind: str, request: RecommendationRequest) -> tuple:
+    """Normalized request: interests sorted and lower-cased, budget bucketed"""
+    budget = None if request.budget is None else request.budget // config.LLM_CACHE_BUDGET_STEP
+    interests = tuple(sorted({i.strip().lower() for i in request.interests or [] if i.strip()}))
+    style = (request.travel_style or "").strip().lower() or None
+    return (kind, request.destination_id, budget, request.duration, interests, style)
+
+async def cached_llm_answer(kind: str, request: RecommendationRequest, build_prompt, response: Response) -> str:
+    """LLM answer for a request, reused from llm_cache when an equivalent
+    request was answered under the current catalog version"""
+    key = llm_cache_key(kind, request)
+    version = await run_storage(repo.version, *CATALOG_TABLES)
+    cached = llm_cache.get(key, version)
+    response.headers["X-Cache"] = "HIT" if cached is not None else "MISS"
+    if cached is None:
+        prompt = await run_storage(build_prompt, request)
+        answer = await get_groq_recommendations(prompt)
+        cached = (answer, count_tokens(prompt))
+        # Demo-mode / fallback answers aren't kept, so a Groq outage doesn't
+        # stick for the whole TTL
+        if answer != get_mock_recommendations(prompt):
+            llm_cache.put(key, version, cached)
+    answer, prompt_tokens = cached
+    response.headers["X-Prompt-Tokens"] = str(prompt_tokens)
+    return answer
+
+async def get_groq_recommendations(prompt: str) -> str:
     """Get recommendations from Groq LLM"""
     try:
-        # Check if Groq is available
-        if Groq is None:
+        # No client when groq isn't installed or no API key is configured
+        if groq_client is None:
             return get_mock_recommendations(prompt)
         
-        # Initialize Groq client when needed
-        if config.GROQ_API_KEY == "your_groq_api_key_here":
-            return get_mock_recommendations(prompt)
-        
-        groq_client = Groq(api_key=config.GROQ_API_KEY)
-        chat_completion = groq_client.chat.completions.create(
+        chat_completion = await groq_client.chat.completions.create(
             messages=[
                 {
                     "role": "user",
                     "content": prompt
                 }
             ],
-            model="llama3-8b-8192",
+            model=config.GROQ_MODEL,
             temperature=0.7,
-            max_tokens=1000
+            max_tokens=1000,
+            timeout=config.GROQ_TIMEOUT,
         )
         return chat_completion.choices[0].message.content
     except Exception as e:
         return get_mock_recommendations(prompt)
 
+async def stream_groq_recommendations(prompt: str) -> AsyncIterator[str]:
+    """Completion text from Groq piece by piece, as the model produces it.
+
+    Falls back to the mock text when there is no client or the call fails
+    before any text arrived; a failure mid-stream is raised to the caller.
+    """
+    if groq_client is None:
+        yield get_mock_recommendations(prompt)
+        return
+    started = False
+    try:
+        stream = await groq_client.chat.completions.create(
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            model=config.GROQ_MODEL,
+            temperature=0.7,
+            max_tokens=1000,
+            timeout=config.GROQ_TIMEOUT,
+            stream=True,
+        )
+        async for chunk in stream:
+            piece = chunk.choices[0].delta.content if chunk.choices else None
+            if piece:
+                started = True
+                yield piece
+    except Exception:
+        if started:
+            raise
+        yield get_mock_recommendations(prompt)
+
 def get_mock_recommendations(prompt: str) -> str:
     """Fallback mock recommendations when Groq is not available"""
     return """
@@ -233,59 +741,55 @@ def get_mock_recommendations(prompt: str) -> str:
 @app.post("/auth/register", response_model=Dict[str, str])
 async def register(user: UserCreate):
     """Register a new user"""
-    users_df = load_csv(config.USERS_FILE)
-    
     # Check if user already exists
-    if not users_df.empty and (user.username in users_df['username'].values or user.email in users_df['email'].values):
+    taken = (await run_storage(user_index.by_username, user.username) is not None
+             or await run_storage(user_index.by_email, user.email) is not None)
+    if taken:
         raise HTTPException(status_code=400, detail="Username or email already exists")
     
-    # Create new user
-    new_user_id = users_df['user_id'].max() + 1 if not users_df.empty else 1
-    hashed_password = hash_password(user.password)
-    
-    new_user = pd.DataFrame([{
-        'user_id': new_user_id,
-        'username': user.username,
-        'email': user.email,
-        'password': hashed_password,
-        'role': 'user',
-        'created_at': datetime.now().strftime('%Y-%m-%d')
-    }])
+    # Create new user (user_id is allocated by the repository)
+    hashed_password = await hash_password(user.password)
     
-    if users_df.empty:
-        save_csv(new_user, config.USERS_FILE)
-    else:
-        save_csv(pd.concat([users_df, new_user], ignore_index=True), config.USERS_FILE)
+    try:
+        await run_storage(repo.insert, "users", {
+            'username': user.username,
+            'email': user.email,
+            'password': hashed_password,
+            'role': 'user',
+            'created_at': datetime.now().strftime('%Y-%m-%d')
+        })
+    except DuplicateRowError:
+        raise HTTPException(status_code=400, detail="Username or email already exists")
+    finally:
+        user_index.invalidate()
     
     return {"message": "User registered successfully"}
 
 @app.post("/auth/login", response_model=Dict[str, str])
 async def login(user: UserLogin):
     """Login user and return access token"""
-    users_df = load_csv(config.USERS_FILE)
-    user_data = users_df[users_df['username'] == user.username]
+    user_data = await run_storage(user_index.by_username, user.username)
     
-    if user_data.empty or not verify_password(user.password, user_data.iloc[0]['password']):
+    if user_data is None or not await verify_password(user.password, user_data['password']):
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data={
+        "sub": user.username,
+        "user_id": user_data['user_id'],
+        "role": user_data['role'],
+    })
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Destination endpoints
 @app.get("/destinations", response_model=List[Destination])
 async def get_destinations():
     """Get all destinations"""
-    destinations_df = load_csv(config.DESTINATIONS_FILE)
-    if destinations_df.empty:
-        return []
-    
-    return [Destination(**row) for _, row in destinations_df.iterrows()]
+    return await list_response("destinations", Destination)
 
 @app.get("/destinations/{destination_id}", response_model=Destination)
 async def get_destination(destination_id: int):
     """Get destination by ID"""
-    destinations_df = load_csv(config.DESTINATIONS_FILE)
-    destination = destinations_df[destinations_df['destination_id'] == destination_id]
+    destination = await run_storage(repo.find, "destinations", "destination_id", destination_id)
     
     if destination.empty:
         raise HTTPException(status_code=404, detail="Destination not found")
@@ -296,76 +800,65 @@ async def get_destination(destination_id: int):
 @app.get("/hotels", response_model=List[Hotel])
 async def get_hotels(destination_id: Optional[int] = None):
     """Get hotels, optionally filtered by destination"""
-    hotels_df = load_csv(config.HOTELS_FILE)
-    if hotels_df.empty:
-        return []
-    
     if destination_id:
-        hotels_df = hotels_df[hotels_df['destination_id'] == destination_id]
-    
-    return [Hotel(**row) for _, row in hotels_df.iterrows()]
+        return await list_response("hotels", Hotel, "destination_id", destination_id)
+    return await list_response("hotels", Hotel)
+
+# Price-sorted arrays per destination and an amenity index (hotel_search.py)
+hotel_index = HotelSearchIndex(repo, lambda df: frame_to_json(df, Hotel, lines=True))
+
+@app.get("/hotels/search", response_model=List[Hotel])
+async def search_hotels(
+    destination_id: Optional[int] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    amenities: Optional[str] = Query(None, description="Comma-separated, all required (e.g. WiFi,Spa)"),
+    sort: str = Query("price_asc", pattern="^(" + "|".join(SORT_ORDERS) + ")$"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Search hotels by price range, minimum rating and required amenities"""
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="min_price must not exceed max_price")
+    required = [a for a in amenities.split(",") if a.strip()] if amenities else None
+    body = await run_storage(
+        functools.partial(hotel_index.search, destination_id, min_price, max_price, min_rating, required, sort, limit)
+    )
+    return Response(content=body, media_type="application/json")
 
 # Activity endpoints
 @app.get("/activities", response_model=List[Activity])
 async def get_activities(destination_id: Optional[int] = None):
     """Get activities, optionally filtered by destination"""
-    activities_df = load_csv(config.ACTIVITIES_FILE)
-    if activities_df.empty:
-        return []
-    
     if destination_id:
-        activities_df = activities_df[activities_df['destination_id'] == destination_id]
-    
-    return [Activity(**row) for _, row in activities_df.iterrows()]
+        return await list_response("activities", Activity, "destination_id", destination_id)
+    return await list_response("activities", Activity)
 
 # Itinerary endpoints
 @app.get("/itineraries", response_model=List[Itinerary])
 async def get_itineraries(current_user: User = Depends(get_current_user)):
     """Get user's itineraries"""
-    itineraries_df = load_csv(config.ITINERARIES_FILE)
-    if itineraries_df.empty:
-        return []
-    
-    user_itineraries = itineraries_df[itineraries_df['user_id'] == current_user.user_id]
+    user_itineraries = await run_storage(repo.find, "itineraries", "user_id", current_user.user_id)
     if user_itineraries.empty:
         return []
     
-    itineraries = []
-    for _, row in user_itineraries.iterrows():
-        itinerary = Itinerary(
-            itinerary_id=row['itinerary_id'],
-            user_id=row['user_id'],
-            name=row['name'],
-            start_date=row['start_date'],
-            end_date=row['end_date'],
-            details_json=json.loads(row['details_json']),
-            created_at=row['created_at']
-        )
-        itineraries.append(itinerary)
+    itineraries = user_itineraries[list(Itinerary.model_fields)].to_dict('records')
+    for itinerary in itineraries:
+        itinerary['details_json'] = json.loads(itinerary['details_json'])
     
     return itineraries
 
 @app.post("/itineraries", response_model=Dict[str, str])
 async def create_itinerary(itinerary: ItineraryCreate, current_user: User = Depends(get_current_user)):
     """Create a new itinerary"""
-    itineraries_df = load_csv(config.ITINERARIES_FILE)
-    
-    new_itinerary_id = itineraries_df['itinerary_id'].max() + 1 if not itineraries_df.empty else 1
-    
-    new_itinerary = pd.DataFrame([{
-        'itinerary_id': new_itinerary_id,
+    await run_storage(repo.insert, "itineraries", {
         'user_id': current_user.user_id,
         'name': itinerary.name,
         'start_date': itinerary.start_date,
         'end_date': itinerary.end_date,
         'details_json': json.dumps(itinerary.details_json),
         'created_at': datetime.now().strftime('%Y-%m-%d')
-    }])
-    
-    if itineraries_df.empty:
-        save_csv(new_itinerary, config.ITINERARIES_FILE)
-    else:
-        save_csv(pd.concat([itineraries_df, new_itinerary], ignore_index=True), config.ITINERARIES_FILE)
+    })
     
     return {"message": "Itinerary created successfully"}
 
@@ -373,141 +866,107 @@ async def create_itinerary(itinerary: ItineraryCreate, current_user: User = Depe
 @app.get("/reviews", response_model=List[Review])
 async def get_reviews(destination_id: Optional[int] = None):
     """Get reviews, optionally filtered by destination"""
-    reviews_df = load_csv(config.REVIEWS_FILE)
-    if reviews_df.empty:
-        return []
-    
     if destination_id:
-        reviews_df = reviews_df[reviews_df['destination_id'] == destination_id]
-    
-    return [Review(**row) for _, row in reviews_df.iterrows()]
+        return await list_response("reviews", Review, "destination_id", destination_id)
+    return await list_response("reviews", Review)
 
 @app.post("/reviews", response_model=Dict[str, str])
 async def create_review(review: ReviewCreate, current_user: User = Depends(get_current_user)):
     """Create a new review"""
-    reviews_df = load_csv(config.REVIEWS_FILE)
-    
-    new_review_id = reviews_df['review_id'].max() + 1 if not reviews_df.empty else 1
-    
-    new_review = pd.DataFrame([{
-        'review_id': new_review_id,
+    await run_storage(repo.insert, "reviews", {
         'user_id': current_user.user_id,
         'destination_id': review.destination_id,
         'rating': review.rating,
         'comment': review.comment,
         'created_at': datetime.now().strftime('%Y-%m-%d')
-    }])
-    
-    if reviews_df.empty:
-        save_csv(new_review, config.REVIEWS_FILE)
-    else:
-        save_csv(pd.concat([reviews_df, new_review], ignore_index=True), config.REVIEWS_FILE)
+    })
     
     return {"message": "Review created successfully"}
 
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """One Server-Sent Event with a JSON payload"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def stream_llm_answer(kind: str, request: RecommendationRequest, build_prompt, on_complete=None) -> StreamingResponse:
+    """Server-Sent Events for an LLM answer: {"text": ...} events as the
+    model produces text, then a "done" event (or "error" if the model stream
+    broke off). Complete answers go through llm_cache like cached_llm_answer,
+    and on_complete(text) runs once the whole answer has been sent."""
+    key = llm_cache_key(kind, request)
+    version = await run_storage(repo.version, *CATALOG_TABLES)
+    cached = llm_cache.get(key, version)
+    prompt = None if cached is not None else await run_storage(build_prompt, request)
+    prompt_tokens = cached[1] if cached is not None else count_tokens(prompt)
+
+    async def events():
+        if cached is not None:
+            text = cached[0]
+            yield sse_event({"text": text})
+        else:
+            parts = []
+            try:
+                async for piece in stream_groq_recommendations(prompt):
+                    parts.append(piece)
+                    yield sse_event({"text": piece})
+            except Exception as e:
+                yield sse_event({"detail": f"Model stream failed: {e}"}, event="error")
+                return
+            text = "".join(parts)
+            if text != get_mock_recommendations(prompt):
+                llm_cache.put(key, version, (text, prompt_tokens))
+        if on_complete is not None:
+            on_complete(text)
+        yield sse_event({"prompt_tokens": prompt_tokens, "cached": cached is not None}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Cache": "HIT" if cached is not None else "MISS",
+            "X-Prompt-Tokens": str(prompt_tokens),
+        },
+    )
+
 # Recommendation endpoints
 @app.post("/recommendations", response_model=Dict[str, str])
-async def get_recommendations(request: RecommendationRequest):
+async def get_recommendations(request: RecommendationRequest, response: Response):
     """Get AI-powered travel recommendations"""
-    # Load data
-    destinations_df = load_csv(config.DESTINATIONS_FILE)
-    hotels_df = load_csv(config.HOTELS_FILE)
-    activities_df = load_csv(config.ACTIVITIES_FILE)
-    reviews_df = load_csv(config.REVIEWS_FILE)
-    
-    # Build context for LLM
-    context = f"""
-    Travel Planning Data:
-    
-    Destinations: {destinations_df.to_dict('records')[:5]}
-    Hotels: {hotels_df.to_dict('records')[:10]}
-    Activities: {activities_df.to_dict('records')[:15]}
-    Reviews: {reviews_df.to_dict('records')[:5]}
-    
-    User Request:
-    - Destination ID: {request.destination_id}
-    - Budget: {request.budget}
-    - Duration: {request.duration} days
-    - Interests: {request.interests}
-    - Travel Style: {request.travel_style}
-    
-    Please provide personalized travel recommendations including:
-    1. Recommended destinations
-    2. Hotel suggestions within budget
-    3. Activities based on interests
-    4. Sample itinerary
-    5. Travel tips
-    """
+    # Only the catalog rows relevant to this request go into the prompt
+    recommendations = await cached_llm_answer("recommendations", request, recommendation_prompt, response)
     
-    recommendations = get_groq_recommendations(context)
-    
-    # Save to analytics
-    analytics_df = load_csv(config.ANALYTICS_FILE)
-    new_analytics_id = analytics_df['analytics_id'].max() + 1 if not analytics_df.empty else 1
-    
-    new_analytics = pd.DataFrame([{
-        'analytics_id': new_analytics_id,
-        'type': 'recommendation',
-        'entity_id': request.destination_id or 0,
-        'insight_text': recommendations,
-        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }])
-    
-    if analytics_df.empty:
-        save_csv(new_analytics, config.ANALYTICS_FILE)
-    else:
-        save_csv(pd.concat([analytics_df, new_analytics], ignore_index=True), config.ANALYTICS_FILE)
+    # Save to analytics (written in the background, see AnalyticsWriter)
+    analytics_writer.record('recommendation', request.destination_id or 0, recommendations)
     
     return {"recommendations": recommendations}
 
 @app.post("/itinerary/generate", response_model=Dict[str, str])
-async def generate_itinerary(request: RecommendationRequest):
+async def generate_itinerary(request: RecommendationRequest, response: Response):
     """Generate a complete itinerary using AI"""
-    # Load data
-    destinations_df = load_csv(config.DESTINATIONS_FILE)
-    hotels_df = load_csv(config.HOTELS_FILE)
-    activities_df = load_csv(config.ACTIVITIES_FILE)
-    
-    # Get destination info
-    destination_info = ""
-    if request.destination_id:
-        dest = destinations_df[destinations_df['destination_id'] == request.destination_id]
-        if not dest.empty:
-            destination_info = f"Destination: {dest.iloc[0]['name']}, {dest.iloc[0]['country']}"
-    
-    # Build prompt for itinerary generation
-    prompt = f"""
-    Generate a detailed travel itinerary with the following requirements:
-    
-    {destination_info}
-    Duration: {request.duration} days
-    Budget: ${request.budget}
-    Interests: {request.interests}
-    Travel Style: {request.travel_style}
-    
-    Available data:
-    Destinations: {destinations_df.to_dict('records')}
-    Hotels: {hotels_df.to_dict('records')}
-    Activities: {activities_df.to_dict('records')}
-    
-    Please provide:
-    1. Day-by-day itinerary
-    2. Hotel recommendations
-    3. Activity suggestions
-    4. Budget breakdown
-    5. Travel tips
-    6. Return the response in JSON format suitable for the itinerary details_json field
-    """
-    
-    itinerary = get_groq_recommendations(prompt)
+    # Catalog data is packed most-relevant-first into a fixed token budget
+    itinerary = await cached_llm_answer("itinerary", request, itinerary_prompt, response)
     
     return {"itinerary": itinerary}
 
+@app.post("/recommendations/stream")
+async def stream_recommendations(request: RecommendationRequest):
+    """/recommendations as Server-Sent Events, streamed as the model writes"""
+    def save(text: str) -> None:
+        analytics_writer.record('recommendation', request.destination_id or 0, text)
+    return await stream_llm_answer("recommendations", request, recommendation_prompt, on_complete=save)
+
+@app.post("/itinerary/generate/stream")
+async def stream_itinerary(request: RecommendationRequest):
+    """/itinerary/generate as Server-Sent Events, streamed as the model writes"""
+    return await stream_llm_answer("itinerary", request, itinerary_prompt)
+
 # Health check
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {"status": "healthy", "timestamp": datetime.now().isoformat(), "analytics": analytics_writer.stats()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Copy the Travel Planner CSV tables into the SQLite database
+
+Loads every file in config.TABLE_FILES into config.SQLITE_FILE (or --db).
+Rows already in the database (same id, username or email) are skipped, so the
+command can be rerun safely. Start the API with TRAVEL_STORAGE=sqlite to serve
+from the database afterwards.
+
+Usage:
+    python migrate_to_sqlite.py [--db data/travel.db]
+"""
+import argparse
+import sys
+
+import config
+from repository import migrate_csv_to_sqlite
+
+
+def main(args) -> int:
+    print(f"🗄️  Migrating CSV tables from {config.DATA_DIR}/ into {args.db}")
+    try:
+        report = migrate_csv_to_sqlite(config.TABLE_FILES, args.db)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+    for name, counts in report.items():
+        print(f"  {name:<14} {counts['read']:>7} read {counts['inserted']:>7} inserted {counts['skipped']:>7} skipped")
+    print("✅ Migration complete")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default=config.SQLITE_FILE)
+    sys.exit(main(parser.parse_args()))
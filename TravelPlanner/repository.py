@@ -0,0 +1,522 @@
+"""
+Table repositories for the Travel Planner API.
+
+Handlers read whole tables as DataFrames (table), look rows up by one column
+(find) and insert rows (append, or append_many for a batch in one write). Two
+backends implement that:
+
+- CsvRepository: the CSV files in data/. Each table is read once and served
+  from memory; before a table is handed out its file is stat'ed and it is
+  only re-read when the mtime or size changed. New rows are appended to the
+  end of the file under a per-table file lock (shared with other worker
+  processes), and every `compact_every` appends the table is rewritten in
+  one piece from the cached frame. Re-reads take the same lock, so a reader
+  never sees a batch another process is still writing.
+- SqliteRepository: one SQLite database in WAL mode with a primary key per
+  table, unique usernames and emails and indexes on the foreign keys the API
+  filters on. migrate_csv_to_sqlite() loads it from the CSV files.
+
+New rows get their primary key from insert() / insert_many(), which take the
+current max key and write the rows as one atomic step (under the table's
+file lock for CSV, inside a BEGIN IMMEDIATE transaction for SQLite), so
+concurrent writers in any number of processes never reuse a key.
+
+Frames returned by table() and find() may be shared: callers filter or concat
+them into new frames but never modify them in place.
+"""
+import csv
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from filelock import FileLock
+
+PRIMARY_KEYS = {
+    "users": "user_id",
+    "destinations": "destination_id",
+    "hotels": "hotel_id",
+    "activities": "activity_id",
+    "itineraries": "itinerary_id",
+    "reviews": "review_id",
+    "analytics": "analytics_id",
+}
+
+# Columns no two rows of a table may share (SQLite enforces them in the
+# schema; CsvRepository.insert_many checks them under the table lock)
+UNIQUE_COLUMNS = {
+    "users": ("username", "email"),
+}
+
+
+class DuplicateRowError(ValueError):
+    """An append that would break a unique column (username, email, id)"""
+
+
+class TableRepository(ABC):
+    name = "base"
+
+    def load_all(self) -> None:
+        """Read every table up front (called at startup)"""
+
+    @abstractmethod
+    def table(self, name: str) -> pd.DataFrame:
+        """All rows of a table"""
+
+    def find(self, name: str, column: str, value: Any) -> pd.DataFrame:
+        """Rows of a table whose `column` equals `value`"""
+        frame = self.table(name)
+        if frame.empty or column not in frame.columns:
+            return frame.iloc[0:0]
+        return frame[frame[column] == value]
+
+    def append(self, name: str, row: Dict[str, Any]) -> None:
+        """Insert one row"""
+        self.append_many(name, [row])
+
+    @abstractmethod
+    def append_many(self, name: str, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows in one write (one file append / one transaction)"""
+
+    def insert(self, name: str, row: Dict[str, Any]) -> int:
+        """Insert one row under a newly allocated primary key; returns the key"""
+        return self.insert_many(name, [row])[0]
+
+    @abstractmethod
+    def insert_many(self, name: str, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert rows without primary keys, allocating consecutive new keys
+        atomically with the write (also across processes); returns the keys.
+        Raises DuplicateRowError when a row would repeat a UNIQUE_COLUMNS value."""
+
+    @abstractmethod
+    def save(self, name: str, df: pd.DataFrame) -> None:
+        """Replace a whole table"""
+
+    def compact(self, name: str) -> None:
+        """Reclaim space left behind by appends; a no-op where nothing builds up"""
+
+    @abstractmethod
+    def version(self, *names: str) -> Tuple[int, ...]:
+        """Per-table change counters; changes whenever any of the tables changes"""
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop cached frames so the next access reads from storage"""
+
+
+# ---------------------------------------------------------------------------
+# CSV files
+# ---------------------------------------------------------------------------
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_header(path: str) -> Optional[List[str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), None)
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) in (b"\n", b"\r")
+
+
+class CsvRepository(TableRepository):
+    name = "csv"
+
+    def __init__(self, files: Dict[str, str], compact_every: int = 1000):
+        self.files = dict(files)
+        self.compact_every = compact_every
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._appends: Dict[str, int] = {name: 0 for name in self.files}
+        self._versions: Dict[str, int] = {name: 0 for name in self.files}
+        self._file_locks = {name: FileLock(f"{path}.lock") for name, path in self.files.items()}
+        self._lock = threading.RLock()
+
+    def load_all(self) -> None:
+        for name in self.files:
+            self.table(name)
+
+    def table(self, name: str) -> pd.DataFrame:
+        path = self.files[name]
+        stamp = _file_stamp(path)
+        with self._lock:
+            if name in self._frames and self._stamps[name] == stamp:
+                pending = self._pending.pop(name, None)
+                if pending:
+                    self._frames[name] = pd.concat(
+                        [self._frames[name], pd.DataFrame(pending)], ignore_index=True
+                    )
+                return self._frames[name]
+            # Re-read under the table's file lock, which writers in every
+            # process hold while appending or compacting, so a half-written
+            # batch is never parsed (or cached under its stamp)
+            with self._file_locks[name]:
+                stamp = _file_stamp(path)
+                frame = pd.read_csv(path) if stamp is not None else pd.DataFrame()
+            self._frames[name] = frame
+            self._stamps[name] = stamp
+            self._pending.pop(name, None)
+            self._versions[name] += 1
+            return frame
+
+    def save(self, name: str, df: pd.DataFrame) -> None:
+        path = self.files[name]
+        with self._lock, self._file_locks[name]:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            df.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            self._frames[name] = df
+            self._stamps[name] = _file_stamp(path)
+            self._pending.pop(name, None)
+            self._appends[name] = 0
+            self._versions[name] += 1
+
+    def append_many(self, name: str, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        path = self.files[name]
+        with self._lock, self._file_locks[name]:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            stamp = _file_stamp(path)
+            # Only keep the cached frame if nobody else touched the file since
+            # it was read; otherwise the next table() call re-reads it anyway.
+            in_sync = name in self._frames and self._stamps[name] == stamp
+            header = _read_header(path) if stamp is not None and stamp[1] > 0 else None
+            columns = header or list(rows[0])
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                if header is None:
+                    writer.writerow(columns)
+                elif not _ends_with_newline(path):
+                    f.write("\n")
+                writer.writerows(
+                    ["" if row.get(column) is None else row.get(column) for column in columns] for row in rows
+                )
+            if in_sync:
+                self._pending.setdefault(name, []).extend(
+                    {column: row.get(column) for column in columns} for row in rows
+                )
+                self._stamps[name] = _file_stamp(path)
+            else:
+                self._frames.pop(name, None)
+                self._stamps.pop(name, None)
+                self._pending.pop(name, None)
+            self._versions[name] += 1
+            self._appends[name] += len(rows)
+            if self.compact_every and self._appends[name] >= self.compact_every:
+                self.compact(name)
+
+    def insert_many(self, name: str, rows: List[Dict[str, Any]]) -> List[int]:
+        if not rows:
+            return []
+        key = PRIMARY_KEYS[name]
+        # The file lock is held from reading the current max key until the
+        # rows are on disk, so no other writer (thread or process) can take
+        # the same keys or slip a row in between
+        with self._lock, self._file_locks[name]:
+            frame = self.table(name)  # re-read if another process appended
+            for column in UNIQUE_COLUMNS.get(name, ()):
+                values = [row.get(column) for row in rows]
+                if len(set(values)) < len(values) or (
+                    column in frame.columns and frame[column].isin(values).any()
+                ):
+                    raise DuplicateRowError(f"{name}.{column} already exists")
+            start = int(frame[key].max()) + 1 if not frame.empty else 1
+            keys = list(range(start, start + len(rows)))
+            self.append_many(name, [{key: k, **row} for k, row in zip(keys, rows)])
+            return keys
+
+    def compact(self, name: str) -> None:
+        """Rewrite a table's file in one piece from its current contents"""
+        with self._lock, self._file_locks[name]:
+            if _file_stamp(self.files[name]) is None:
+                return
+            self.save(name, self.table(name))
+
+    def version(self, *names: str) -> Tuple[int, ...]:
+        names = names or tuple(self.files)
+        with self._lock:
+            for name in names:
+                self.table(name)  # picks up files changed on disk
+            return tuple(self._versions[name] for name in names)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [name] if name else list(self._frames):
+                self._frames.pop(key, None)
+                self._stamps.pop(key, None)
+                self._pending.pop(key, None)
+
+
+# ---------------------------------------------------------------------------
+# SQLite
+# ---------------------------------------------------------------------------
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS destinations (
+    destination_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    country TEXT NOT NULL,
+    description TEXT,
+    image_url TEXT,
+    climate TEXT,
+    best_time_to_visit TEXT
+);
+CREATE TABLE IF NOT EXISTS hotels (
+    hotel_id INTEGER PRIMARY KEY,
+    destination_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    price_per_night INTEGER,
+    rating INTEGER,
+    availability TEXT,
+    amenities TEXT
+);
+CREATE INDEX IF NOT EXISTS hotels_destination_id ON hotels(destination_id);
+CREATE TABLE IF NOT EXISTS activities (
+    activity_id INTEGER PRIMARY KEY,
+    destination_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT,
+    price INTEGER,
+    rating INTEGER,
+    duration INTEGER,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS activities_destination_id ON activities(destination_id);
+CREATE TABLE IF NOT EXISTS itineraries (
+    itinerary_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    start_date TEXT,
+    end_date TEXT,
+    details_json TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS itineraries_user_id ON itineraries(user_id);
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    destination_id INTEGER NOT NULL,
+    rating INTEGER,
+    comment TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS reviews_user_id ON reviews(user_id);
+CREATE INDEX IF NOT EXISTS reviews_destination_id ON reviews(destination_id);
+CREATE TABLE IF NOT EXISTS analytics (
+    analytics_id INTEGER PRIMARY KEY,
+    type TEXT,
+    entity_id INTEGER,
+    insight_text TEXT,
+    generated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Every write bumps the table's counter, so cached frames (in this process or
+# any other one sharing the database) can tell when they are stale.
+SQLITE_VERSION_TRIGGERS = """
+INSERT OR IGNORE INTO table_versions (name) VALUES ('{table}');
+CREATE TRIGGER IF NOT EXISTS {table}_version_insert AFTER INSERT ON {table} BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_version_update AFTER UPDATE ON {table} BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_version_delete AFTER DELETE ON {table} BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+END;
+"""
+
+
+class SqliteRepository(TableRepository):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+        for table in PRIMARY_KEYS:
+            self._conn.executescript(SQLITE_VERSION_TRIGGERS.format(table=table))
+        self._conn.commit()
+        self._columns = {
+            table: [r[1] for r in self._conn.execute(f"PRAGMA table_info({table})")]
+            for table in PRIMARY_KEYS
+        }
+        self._frames: Dict[str, Tuple[int, pd.DataFrame]] = {}
+
+    def _versions(self) -> Dict[str, int]:
+        return dict(self._conn.execute("SELECT name, version FROM table_versions"))
+
+    def _read(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self._conn, params=params)
+
+    def load_all(self) -> None:
+        for name in PRIMARY_KEYS:
+            self.table(name)
+
+    def table(self, name: str) -> pd.DataFrame:
+        with self._lock:
+            version = self._versions()[name]
+            cached = self._frames.get(name)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            frame = self._read(f"SELECT * FROM {name} ORDER BY {PRIMARY_KEYS[name]}")
+            self._frames[name] = (version, frame)
+            return frame
+
+    def find(self, name: str, column: str, value: Any) -> pd.DataFrame:
+        if column not in self._columns[name]:
+            raise KeyError(f"{name} has no column {column!r}")
+        if hasattr(value, "item"):
+            value = value.item()  # numpy scalar from a DataFrame
+        with self._lock:
+            return self._read(
+                f"SELECT * FROM {name} WHERE {column} = ? ORDER BY {PRIMARY_KEYS[name]}", (value,)
+            )
+
+    def append_many(self, name: str, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        columns = [c for c in self._columns[name] if c in rows[0]]
+        values = [
+            tuple(row.get(c).item() if hasattr(row.get(c), "item") else row.get(c) for c in columns)
+            for row in rows
+        ]
+        sql = f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        with self._lock:
+            try:
+                self._conn.executemany(sql, values)
+                self._conn.commit()
+            except sqlite3.IntegrityError as e:
+                self._conn.rollback()
+                raise DuplicateRowError(str(e)) from e
+
+    def insert_many(self, name: str, rows: List[Dict[str, Any]]) -> List[int]:
+        if not rows:
+            return []
+        key = PRIMARY_KEYS[name]
+        columns = [c for c in self._columns[name] if c in rows[0] and c != key]
+        sql = f"INSERT INTO {name} ({', '.join([key] + columns)}) VALUES ({', '.join('?' * (len(columns) + 1))})"
+        with self._lock:
+            try:
+                # BEGIN IMMEDIATE takes the database write lock before the max
+                # key is read, so other connections/processes wait their turn
+                self._conn.execute("BEGIN IMMEDIATE")
+                start = self._conn.execute(f"SELECT COALESCE(MAX({key}), 0) + 1 FROM {name}").fetchone()[0]
+                keys = list(range(start, start + len(rows)))
+                self._conn.executemany(sql, [
+                    (k, *(row.get(c).item() if hasattr(row.get(c), "item") else row.get(c) for c in columns))
+                    for k, row in zip(keys, rows)
+                ])
+                self._conn.commit()
+            except sqlite3.IntegrityError as e:
+                self._conn.rollback()
+                raise DuplicateRowError(str(e)) from e
+            except BaseException:
+                self._conn.rollback()
+                raise
+            return keys
+
+    def save(self, name: str, df: pd.DataFrame) -> None:
+        columns = [c for c in self._columns[name] if c in df.columns]
+        sql = f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        rows = df[columns].astype(object).where(df[columns].notna(), None).itertuples(index=False, name=None)
+        with self._lock:
+            try:
+                self._conn.execute(f"DELETE FROM {name}")
+                self._conn.executemany(sql, rows)
+                self._conn.commit()
+            except sqlite3.IntegrityError as e:
+                self._conn.rollback()
+                raise DuplicateRowError(str(e)) from e
+
+    def import_frame(self, name: str, df: pd.DataFrame) -> int:
+        """Insert rows that are not there yet; returns how many were added"""
+        columns = [c for c in self._columns[name] if c in df.columns]
+        sql = (f"INSERT OR IGNORE INTO {name} ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * len(columns))})")
+        rows = df[columns].astype(object).where(df[columns].notna(), None).itertuples(index=False, name=None)
+        with self._lock:
+            before = self._conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+            self._conn.executemany(sql, rows)
+            self._conn.commit()
+            return self._conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0] - before
+
+    def version(self, *names: str) -> Tuple[int, ...]:
+        with self._lock:
+            versions = self._versions()
+        return tuple(versions[name] for name in names or PRIMARY_KEYS)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name:
+                self._frames.pop(name, None)
+            else:
+                self._frames.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_csv_to_sqlite(files: Dict[str, str], sqlite_path: str) -> Dict[str, Dict[str, int]]:
+    """Copy every CSV table into the SQLite database.
+
+    Rows whose primary key (or username/email) is already present are skipped,
+    so running it again only adds what is new. Returns per-table counts.
+    """
+    repo = SqliteRepository(sqlite_path)
+    report = {}
+    try:
+        for name, path in files.items():
+            df = pd.read_csv(path) if os.path.exists(path) else pd.DataFrame()
+            inserted = repo.import_frame(name, df) if not df.empty else 0
+            report[name] = {"read": len(df), "inserted": inserted, "skipped": len(df) - inserted}
+    finally:
+        repo.close()
+    return report
+
+
+def create_repository(backend: str, files: Dict[str, str], sqlite_path: str,
+                      compact_every: int = 1000) -> TableRepository:
+    """Repository for the configured backend ("csv" or "sqlite").
+
+    A SQLite database that does not exist yet is created and loaded from the
+    CSV files first.
+    """
+    if backend == "csv":
+        return CsvRepository(files, compact_every=compact_every)
+    if backend == "sqlite":
+        # Several worker processes may start at once; only one migrates
+        with FileLock(f"{sqlite_path}.lock"):
+            if not os.path.exists(sqlite_path):
+                migrate_csv_to_sqlite(files, sqlite_path)
+        return SqliteRepository(sqlite_path)
+    raise ValueError(f"Unknown storage backend: {backend!r} (expected 'csv' or 'sqlite')")
@@ -0,0 +1,283 @@
+"""
+Catalog retrieval for the Travel Planner LLM prompts.
+
+A Catalog holds lookups over the catalog tables; CatalogIndex builds a new
+one whenever repo.version() of destinations, hotels, activities or reviews
+changes:
+
+- hotels per destination, sorted by price_per_night, so "within the nightly
+  budget" is a bisect over that destination's price list
+- activities per destination, plus an inverted index from lower-cased terms
+  (category and the words of name and description) to activity ids
+- reviews per destination, newest first
+
+retrieve() uses them to pick the rows relevant to one request: the requested
+destination (or the ones whose activities best match the interests), hotels
+at or under budget / duration per night, and activities matching the
+interests. itinerary_sections() yields the same kind of rows for every
+destination in relevance order, and budgeted_tables() renders them until a
+token budget is spent, so the prompt stays the same size however large the
+catalog grows. format_table() renders rows as a compact pipe-separated table
+and count_tokens() estimates how many tokens a prompt costs.
+"""
+import bisect
+import heapq
+import re
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+CATALOG_TABLES = ("destinations", "hotels", "activities", "reviews")
+
+# Interests offered by the UI, mapped to the catalog terms they match.
+# Interests not listed here match on their own (lower-cased) words.
+INTEREST_TERMS = {
+    "culture": {"art", "museum", "museums", "landmark", "religious", "temple", "cathedral", "shrine", "theater", "opera"},
+    "food": {"food", "market", "cuisine", "restaurant"},
+    "adventure": {"outdoor", "surfing", "mountain", "climb", "hike"},
+    "relaxation": {"beach", "park", "cruise", "spa", "scenic"},
+    "history": {"historical", "historic", "ancient", "religious", "cathedral", "temple", "amphitheater"},
+    "nature": {"outdoor", "park", "beach", "mountain", "forest"},
+    "nightlife": {"entertainment", "show", "theater", "bar"},
+    "shopping": {"shopping", "market", "mall"},
+}
+
+MAX_DESTINATIONS = 3
+HOTELS_PER_DESTINATION = 3
+ACTIVITIES_PER_DESTINATION = 5
+REVIEWS_PER_DESTINATION = 2
+ITINERARY_HOTELS_PER_DESTINATION = 5
+ITINERARY_ACTIVITIES_PER_DESTINATION = 10
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate LLM token count: one per word or punctuation mark"""
+    return len(_TOKEN_RE.findall(text))
+
+
+def format_row(row: Dict[str, Any], columns: List[str]) -> str:
+    return "|".join(str(row.get(column, "")).replace("|", "/").replace("\n", " ") for column in columns)
+
+
+def format_table(rows: Iterable[Dict[str, Any]], columns: List[str]) -> str:
+    """Rows as a header line plus one pipe-separated line per row"""
+    return "\n".join(["|".join(columns)] + [format_row(row, columns) for row in rows])
+
+
+def budgeted_tables(sections: Iterable[Tuple[str, List[str], Iterable[Dict[str, Any]]]], max_tokens: int) -> str:
+    """(heading, columns, rows) sections rendered as tables, in order, until
+    the next row would take the text past max_tokens.
+
+    Sections are consumed lazily, so nothing past the cut-off is formatted.
+    """
+    lines: List[str] = []
+    used = 0
+    for heading, columns, rows in sections:
+        header = f"{heading}:\n" + "|".join(columns)
+        header_cost = count_tokens(header)
+        started = False
+        for row in rows:
+            line = format_row(row, columns)
+            cost = count_tokens(line) + (0 if started else header_cost)
+            if used + cost > max_tokens:
+                return "\n".join(lines)
+            if not started:
+                lines.append(header)
+                started = True
+            lines.append(line)
+            used += cost
+    return "\n".join(lines)
+
+
+def interest_terms(interests: Optional[List[str]]) -> Dict[str, Set[str]]:
+    """Catalog terms for each requested interest (keyed by the interest)"""
+    terms = {}
+    for interest in interests or []:
+        key = interest.strip().lower()
+        if key:
+            terms[key] = INTEREST_TERMS.get(key) or set(_WORD_RE.findall(key))
+    return terms
+
+
+def nightly_budget(budget: Optional[int], duration: Optional[int]) -> Optional[float]:
+    """Most the request can spend per night on a hotel, if it has a budget"""
+    if not budget:
+        return None
+    return budget / duration if duration and duration > 0 else float(budget)
+
+
+class Catalog:
+    """One immutable build of the catalog lookups (see module docstring).
+
+    CatalogIndex swaps in a whole new Catalog when a table changes, so a
+    request that holds one never mixes rows from two versions.
+    """
+
+    __slots__ = ("destinations", "hotels_by_destination", "hotel_prices", "activities",
+                 "activities_by_destination", "activity_terms", "reviews_by_destination")
+
+    def __init__(self, destinations=None, hotels_by_destination=None, hotel_prices=None, activities=None,
+                 activities_by_destination=None, activity_terms=None, reviews_by_destination=None):
+        self.destinations: Dict[int, Dict[str, Any]] = destinations or {}
+        self.hotels_by_destination: Dict[int, List[Dict[str, Any]]] = hotels_by_destination or {}
+        self.hotel_prices: Dict[int, List[float]] = hotel_prices or {}
+        self.activities: Dict[int, Dict[str, Any]] = activities or {}
+        self.activities_by_destination: Dict[int, List[Dict[str, Any]]] = activities_by_destination or {}
+        self.activity_terms: Dict[str, Set[int]] = activity_terms or {}
+        self.reviews_by_destination: Dict[int, List[Dict[str, Any]]] = reviews_by_destination or {}
+
+    @classmethod
+    def build(cls, repository) -> "Catalog":
+        destinations = {d['destination_id']: d for d in repository.table("destinations").to_dict('records')}
+
+        hotels_by_destination: Dict[int, List[Dict[str, Any]]] = {}
+        for hotel in sorted(repository.table("hotels").to_dict('records'), key=lambda h: h['price_per_night']):
+            hotels_by_destination.setdefault(hotel['destination_id'], []).append(hotel)
+        hotel_prices = {d: [h['price_per_night'] for h in hotels] for d, hotels in hotels_by_destination.items()}
+
+        activities: Dict[int, Dict[str, Any]] = {}
+        activities_by_destination: Dict[int, List[Dict[str, Any]]] = {}
+        activity_terms: Dict[str, Set[int]] = {}
+        for activity in repository.table("activities").to_dict('records'):
+            activities[activity['activity_id']] = activity
+            activities_by_destination.setdefault(activity['destination_id'], []).append(activity)
+            text = f"{activity['category']} {activity['name']} {activity['description']}".lower()
+            for term in set(_WORD_RE.findall(text)):
+                activity_terms.setdefault(term, set()).add(activity['activity_id'])
+        for rows in activities_by_destination.values():
+            rows.sort(key=lambda a: a['rating'], reverse=True)
+
+        reviews_by_destination: Dict[int, List[Dict[str, Any]]] = {}
+        for review in sorted(repository.table("reviews").to_dict('records'),
+                             key=lambda r: str(r['created_at']), reverse=True):
+            reviews_by_destination.setdefault(review['destination_id'], []).append(review)
+
+        return cls(destinations, hotels_by_destination, hotel_prices, activities,
+                   activities_by_destination, activity_terms, reviews_by_destination)
+
+    def hotels_within(self, destination_id: int, max_price: Optional[float]) -> List[Dict[str, Any]]:
+        """Hotels of a destination at or under max_price per night, cheapest first"""
+        hotels = self.hotels_by_destination.get(destination_id, [])
+        if max_price is None or not hotels:
+            return hotels
+        return hotels[:bisect.bisect_right(self.hotel_prices[destination_id], max_price)]
+
+    def interest_scores(self, terms: Dict[str, Set[str]]) -> Dict[int, int]:
+        """activity_id -> number of requested interests the activity matches"""
+        scores: Dict[int, int] = {}
+        for wanted in terms.values():
+            matched: Set[int] = set()
+            for term in wanted:
+                matched |= self.activity_terms.get(term, set())
+            for activity_id in matched:
+                scores[activity_id] = scores.get(activity_id, 0) + 1
+        return scores
+
+    def ranked_destinations(self, destination_id: Optional[int], max_price: Optional[float],
+                            scores: Dict[int, int]) -> List[int]:
+        """All destination ids, the requested one first and the rest ranked by
+        how many activities match the interests, then by how many hotels fit
+        the nightly budget"""
+        matches: Dict[int, int] = {}
+        for activity_id in scores:
+            dest = self.activities[activity_id]['destination_id']
+            matches[dest] = matches.get(dest, 0) + 1
+        return sorted(
+            self.destinations,
+            key=lambda d: (d != destination_id, -matches.get(d, 0), -len(self.hotels_within(d, max_price)), d),
+        )
+
+    def ranked_activities(self, destination_id: int, scores: Dict[int, int]) -> List[Dict[str, Any]]:
+        """Activities of a destination, best interest match first, then by rating"""
+        return sorted(self.activities_by_destination.get(destination_id, []),
+                      key=lambda a: (scores.get(a['activity_id'], 0), a['rating']), reverse=True)
+
+
+class CatalogIndex:
+    """The current Catalog, rebuilt when a catalog table changes.
+
+    Thread-safe; refreshed lazily on the next lookup after a catalog table
+    changes, like UserIndex in main.py. Each rebuild is published as one new
+    Catalog, and every lookup works on the snapshot it started with.
+    """
+
+    def __init__(self, repository):
+        self._repo = repository
+        self._version = None
+        self._lock = threading.Lock()
+        self._catalog = Catalog()
+
+    def snapshot(self) -> Catalog:
+        """The up-to-date catalog; keep using the returned object for a whole request"""
+        version = self._repo.version(*CATALOG_TABLES)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._catalog = Catalog.build(self._repo)
+                    self._version = version
+        return self._catalog
+
+    def refresh(self) -> None:
+        self.snapshot()
+
+    def invalidate(self) -> None:
+        self._version = None
+
+    def destination(self, destination_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        return self.snapshot().destinations.get(destination_id)
+
+    def retrieve(self, destination_id: Optional[int], budget: Optional[int], duration: Optional[int],
+                 interests: Optional[List[str]]) -> Dict[str, Any]:
+        """The catalog rows relevant to one request, best first per table"""
+        catalog = self.snapshot()
+        max_price = nightly_budget(budget, duration)
+        scores = catalog.interest_scores(interest_terms(interests))
+
+        destination_ids = catalog.ranked_destinations(destination_id, max_price, scores)[:MAX_DESTINATIONS]
+        if destination_id in catalog.destinations:
+            destination_ids = destination_ids[:1]
+
+        hotels, activities, reviews = [], [], []
+        for dest in destination_ids:
+            hotels += heapq.nlargest(HOTELS_PER_DESTINATION, catalog.hotels_within(dest, max_price),
+                                     key=lambda h: (h['rating'], -h['price_per_night']))
+            candidates = catalog.activities_by_destination.get(dest, [])
+            if scores:
+                candidates = [a for a in candidates if a['activity_id'] in scores]
+            activities += heapq.nlargest(ACTIVITIES_PER_DESTINATION, candidates,
+                                         key=lambda a: (scores.get(a['activity_id'], 0), a['rating']))
+            reviews += catalog.reviews_by_destination.get(dest, [])[:REVIEWS_PER_DESTINATION]
+
+        return {
+            "destinations": [catalog.destinations[d] for d in destination_ids],
+            "hotels": hotels,
+            "activities": activities,
+            "reviews": reviews,
+            "max_price": max_price,
+        }
+
+    def itinerary_sections(self, destination_id: Optional[int], budget: Optional[int], duration: Optional[int],
+                           interests: Optional[List[str]]) -> Iterator[Tuple[str, str, List[Dict[str, Any]]]]:
+        """(table, heading, rows) prompt sections, most relevant first.
+
+        Yields the destination row, its hotels within the nightly budget and
+        its activities for each destination in ranked order; the caller stops
+        pulling once its token budget is spent (see budgeted_tables). The
+        whole walk uses the catalog snapshot taken on the first pull.
+        """
+        catalog = self.snapshot()
+        max_price = nightly_budget(budget, duration)
+        scores = catalog.interest_scores(interest_terms(interests))
+        price_note = f" up to ${max_price:.0f}/night" if max_price is not None else ""
+        for dest in catalog.ranked_destinations(destination_id, max_price, scores):
+            name = catalog.destinations[dest]['name']
+            yield "destinations", f"Destination {dest}", [catalog.destinations[dest]]
+            hotels = heapq.nlargest(ITINERARY_HOTELS_PER_DESTINATION, catalog.hotels_within(dest, max_price),
+                                    key=lambda h: (h['rating'], -h['price_per_night']))
+            if hotels:
+                yield "hotels", f"Hotels in {name}{price_note}", hotels
+            activities = catalog.ranked_activities(dest, scores)[:ITINERARY_ACTIVITIES_PER_DESTINATION]
+            if activities:
+                yield "activities", f"Activities in {name}", activities
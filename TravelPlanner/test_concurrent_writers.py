@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Concurrent-writer stress test for the Travel Planner API
+
+Starts the API as `uvicorn main:app --workers 8` (separate processes sharing
+one scratch copy of data/, or one SQLite database with --backend sqlite) and
+hits every write path at once:
+
+- registrations, each username sent twice so both copies race each other
+- POST /reviews and POST /itineraries, every row tagged with a unique marker
+- POST /recommendations, whose analytics rows are written in the background
+- GET /reviews and GET /itineraries alongside the writes, which re-read files
+  other workers are appending to
+
+Afterwards the tables are read back and the test checks that no primary key
+repeats, every username and email appears once, every accepted write is
+there exactly once (nothing lost, nothing doubled) and every read succeeded.
+
+Usage:
+    python test_concurrent_writers.py [--workers 8] [--writes 400] [--backend csv|sqlite] [--port 8771]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _start_workers(args, data_dir: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "TRAVEL_DATA_DIR": data_dir,
+        "TRAVEL_STORAGE": args.backend,
+        "TRAVEL_SQLITE_FILE": os.path.join(data_dir, "travel.db"),
+        "BCRYPT_ROUNDS": "4",
+        "ANALYTICS_FLUSH_INTERVAL": "0.05",
+        "SECRET_KEY": "stress-test-secret-key-0123456789abcdef",
+    })
+    if args.backend == "sqlite":
+        subprocess.run([sys.executable, "migrate_to_sqlite.py"], cwd=HERE, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=HERE, env=env,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/health", timeout=1).status_code == 200:
+                time.sleep(1.0)  # let the remaining workers finish starting
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("API workers did not start")
+
+
+async def _hammer(base_url: str, writes: int, users: int):
+    limits = httpx.Limits(max_connections=64)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        # Every username is registered twice at the same moment
+        registrations = await asyncio.gather(*[
+            client.post("/auth/register", json={
+                "username": f"stress_{i // 2}", "email": f"stress_{i // 2}@example.com", "password": "pw",
+            })
+            for i in range(users * 2)
+        ])
+        logins = await asyncio.gather(*[
+            client.post("/auth/login", json={"username": f"stress_{i}", "password": "pw"}) for i in range(users)
+        ])
+        tokens = [r.json()["access_token"] for r in logins if r.status_code == 200]
+
+        async def write(n: int):
+            headers = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"}
+            if n % 3 == 0:
+                return "itineraries", await client.post("/itineraries", headers=headers, json={
+                    "name": f"stress-{n}", "start_date": "2024-01-01", "end_date": "2024-01-02", "details_json": {"n": n},
+                })
+            if n % 3 == 1:
+                return "reviews", await client.post("/reviews", headers=headers, json={
+                    "destination_id": n % 8 + 1, "rating": 5, "comment": f"stress-{n}",
+                })
+            return "analytics", await client.post("/recommendations", json={"destination_id": n % 8 + 1, "budget": n})
+
+        async def read(n: int):
+            if n % 2:
+                return "reads", await client.get("/reviews")
+            headers = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"}
+            return "reads", await client.get("/itineraries", headers=headers)
+
+        results = await asyncio.gather(*[write(n) for n in range(writes)], *[read(n) for n in range(writes // 2)])
+    return registrations, tokens, results
+
+
+def _check(label: str, ok: bool, detail: str) -> bool:
+    print(f"{'✅' if ok else '❌'} {label}: {detail}")
+    return ok
+
+
+def _read_tables(args, data_dir: str):
+    names = ["users", "itineraries", "reviews", "analytics"]
+    if args.backend == "sqlite":
+        import sqlite3
+        conn = sqlite3.connect(os.path.join(data_dir, "travel.db"))
+        try:
+            return {name: pd.read_sql_query(f"SELECT * FROM {name}", conn) for name in names}
+        finally:
+            conn.close()
+    return {name: pd.read_csv(os.path.join(data_dir, f"{name}.csv")) for name in names}
+
+
+def main(args):
+    data_dir = os.path.join(tempfile.mkdtemp(prefix="travel-test-"), "data")
+    shutil.copytree(os.path.join(HERE, "data"), data_dir)
+    before = {name: len(df) for name, df in _read_tables(argparse.Namespace(backend="csv"), data_dir).items()}
+    users = max(4, args.workers * 2)
+
+    print(f"🧨 {args.workers} uvicorn workers ({args.backend}), {users * 2} racing registrations, {args.writes} writes")
+    proc = _start_workers(args, data_dir)
+    try:
+        registrations, tokens, results = asyncio.run(_hammer(f"http://127.0.0.1:{args.port}", args.writes, users))
+    finally:
+        proc.terminate()  # graceful shutdown flushes queued analytics rows
+        proc.wait(timeout=60)
+
+    tables = _read_tables(args, data_dir)
+    ok = True
+    created = sum(r.status_code == 200 for r in registrations)
+    ok &= _check("registrations", created == users and len(tokens) == users,
+                 f"{created} of {users * 2} accepted for {users} usernames, {len(tokens)} logins")
+    ok &= _check("unique users", tables["users"]["username"].is_unique and tables["users"]["email"].is_unique
+                 and len(tables["users"]) == before["users"] + users,
+                 f"{len(tables['users'])} rows ({before['users']} before)")
+
+    for name, key, tag_column in (("itineraries", "itinerary_id", "name"), ("reviews", "review_id", "comment"),
+                                  ("analytics", "analytics_id", None)):
+        accepted = sum(1 for table, r in results if table == name and r.status_code == 200)
+        failed = sum(1 for table, r in results if table == name and r.status_code != 200)
+        df = tables[name]
+        ok &= _check(f"{name} ids", df[key].is_unique, f"{df[key].duplicated().sum()} duplicated ids")
+        ok &= _check(f"{name} rows", len(df) == before[name] + accepted and failed == 0,
+                     f"{len(df) - before[name]} new rows for {accepted} accepted writes ({failed} failed)")
+        if tag_column:
+            tags = df[tag_column].astype(str)
+            tags = tags[tags.str.startswith("stress-")]
+            ok &= _check(f"{name} content", tags.is_unique and len(tags) == accepted,
+                         f"{tags.nunique()} distinct tagged rows")
+
+    reads = [r for table, r in results if table == "reads"]
+    failed_reads = sum(r.status_code != 200 for r in reads)
+    ok &= _check("reads", failed_reads == 0, f"{len(reads) - failed_reads} of {len(reads)} reads succeeded")
+
+    shutil.rmtree(os.path.dirname(data_dir), ignore_errors=True)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=400)
+    parser.add_argument("--backend", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("--port", type=int, default=8771)
+    sys.exit(0 if main(parser.parse_args()) else 1)
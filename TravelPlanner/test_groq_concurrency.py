@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Concurrency test for the Travel Planner Groq client
+
+Starts a local mock of Groq's OpenAI-compatible completion endpoint that
+answers every request after --delay seconds, points the API at it through
+GROQ_BASE_URL, and fires --requests concurrent POST /recommendations and
+POST /itinerary/generate calls. Because completions are awaited on the shared
+async client, the whole burst should take about one delay (times the number of
+pool-sized waves), not one delay per request, and GET /health must stay fast
+while the completions are in flight. Runs against a scratch copy of data/.
+
+Usage:
+    python test_groq_concurrency.py [--requests 40] [--delay 1.0] [--port 8767] [--mock-port 8768]
+"""
+import argparse
+import asyncio
+import math
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MOCK_REPLY = "Mock itinerary: Day 1 - arrive, Day 2 - explore."
+
+
+def _mock_groq(delay: float, peers: set) -> FastAPI:
+    mock = FastAPI()
+
+    @mock.post("/openai/v1/chat/completions")
+    async def completions(request: Request):
+        peers.add(request.client.port)  # one entry per pooled connection
+        body = await request.json()
+        await asyncio.sleep(delay)
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": MOCK_REPLY},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+    return mock
+
+
+def _start_server(app, port: int):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                                           timeout_keep_alive=120))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+async def _burst(base_url: str, requests: int):
+    probe_ms = []
+    done = asyncio.Event()
+
+    async def probe(client):
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            probe_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.02)
+
+    payload = {"destination_id": 1, "budget": 2000, "duration": 5, "interests": ["Culture"]}
+    limits = httpx.Limits(max_connections=requests + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        probe_task = asyncio.create_task(probe(client))
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            client.post("/recommendations" if i % 2 else "/itinerary/generate", json=payload)
+            for i in range(requests)
+        ])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+    return results, elapsed, probe_ms
+
+
+def main(args):
+    data_dir = os.path.join(tempfile.mkdtemp(prefix="travel-test-"), "data")
+    shutil.copytree(os.path.join(HERE, "data"), data_dir)
+    os.environ["TRAVEL_DATA_DIR"] = data_dir
+    os.environ["GROQ_API_KEY"] = "test-key"
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}"
+    os.environ["GROQ_TIMEOUT"] = str(args.delay * 10)
+    sys.path.insert(0, HERE)
+    import main as app_module
+
+    peers = set()
+    mock_server, mock_thread = _start_server(_mock_groq(args.delay, peers), args.mock_port)
+    server, thread = _start_server(app_module.app, args.port)
+
+    print(f"🤖 {args.requests} concurrent LLM calls against a mock completion server ({args.delay}s per completion)")
+    results, elapsed, probe_ms = asyncio.run(_burst(f"http://127.0.0.1:{args.port}", args.requests))
+
+    ok = True
+    failed = [r for r in results if r.status_code != 200]
+    mocked = [r for r in results if r.status_code == 200 and MOCK_REPLY in r.text]
+    if failed or len(mocked) != args.requests:
+        print(f"❌ {len(failed)} failed, {len(mocked)}/{args.requests} answered by the mock server")
+        ok = False
+    else:
+        print(f"✅ All {args.requests} requests answered by the mock server")
+
+    waves = math.ceil(args.requests / app_module.config.GROQ_MAX_CONNECTIONS)
+    budget = waves * args.delay + 1.0
+    serial = args.requests * args.delay
+    if elapsed <= budget:
+        print(f"✅ Burst took {elapsed:.2f}s (serial would be {serial:.0f}s, limit {budget:.1f}s)")
+    else:
+        print(f"❌ Burst took {elapsed:.2f}s, expected at most {budget:.1f}s")
+        ok = False
+
+    if len(peers) <= app_module.config.GROQ_MAX_CONNECTIONS:
+        print(f"✅ Mock server saw {len(peers)} connections (pool limit {app_module.config.GROQ_MAX_CONNECTIONS})")
+    else:
+        print(f"❌ Mock server saw {len(peers)} connections, pool limit is {app_module.config.GROQ_MAX_CONNECTIONS}")
+        ok = False
+
+    worst = max(probe_ms) if probe_ms else float("inf")
+    if worst < args.delay * 1000 / 2:
+        print(f"✅ GET /health stayed responsive: {len(probe_ms)} probes, max {worst:.1f} ms")
+    else:
+        print(f"❌ GET /health stalled: max {worst:.1f} ms over {len(probe_ms)} probes")
+        ok = False
+
+    server.should_exit = True
+    mock_server.should_exit = True
+    thread.join()
+    mock_thread.join()
+    shutil.rmtree(os.path.dirname(data_dir), ignore_errors=True)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--delay", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--mock-port", type=int, default=8768)
+    sys.exit(0 if main(parser.parse_args()) else 1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Prompt-size test for POST /itinerary/generate
+
+Grows the destinations, hotels and activities tables of a scratch data
+directory to each --sizes row count and builds the itinerary prompt for the
+same request every time. The old prompt (every table dumped with
+to_dict('records')) is measured alongside for comparison. The test passes
+when the prompt never exceeds ITINERARY_PROMPT_TOKENS plus the fixed
+instruction text, and the requested destination's rows come first.
+
+Usage:
+    python test_itinerary_prompt.py [--sizes 10,100,1000,10000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CATEGORIES = ["Landmark", "Art", "Food", "Outdoor", "Religious", "Historical", "Entertainment"]
+AMENITIES = ["WiFi", "Parking", "Restaurant", "Spa", "Pool", "Gym", "Luxury", "Budget"]
+
+
+def _write_catalog(data_dir: str, rows: int) -> None:
+    destinations = max(1, rows // 10)
+    pd.DataFrame({
+        "destination_id": range(1, destinations + 1),
+        "name": [f"City {i}" for i in range(1, destinations + 1)],
+        "country": [f"Country {i % 50}" for i in range(1, destinations + 1)],
+        "description": [f"Destination number {i} with sights and food" for i in range(1, destinations + 1)],
+        "image_url": [f"https://example.com/{i}.jpg" for i in range(1, destinations + 1)],
+        "climate": "Temperate",
+        "best_time_to_visit": "April-October",
+    }).to_csv(os.path.join(data_dir, "destinations.csv"), index=False)
+    pd.DataFrame({
+        "hotel_id": range(1, rows + 1),
+        "destination_id": [i % destinations + 1 for i in range(rows)],
+        "name": [f"Hotel {i}" for i in range(rows)],
+        "price_per_night": [50 + (i * 37) % 950 for i in range(rows)],
+        "rating": [i % 5 + 1 for i in range(rows)],
+        "availability": "Available",
+        "amenities": [",".join(AMENITIES[j] for j in range(8) if (i >> j) & 1) or "WiFi" for i in range(rows)],
+    }).to_csv(os.path.join(data_dir, "hotels.csv"), index=False)
+    pd.DataFrame({
+        "activity_id": range(1, rows + 1),
+        "destination_id": [i % destinations + 1 for i in range(rows)],
+        "name": [f"Activity {i}" for i in range(rows)],
+        "category": [CATEGORIES[i % len(CATEGORIES)] for i in range(rows)],
+        "price": [(i * 13) % 120 for i in range(rows)],
+        "rating": [i % 5 + 1 for i in range(rows)],
+        "duration": [i % 6 + 1 for i in range(rows)],
+        "description": [f"Things to do number {i}" for i in range(rows)],
+    }).to_csv(os.path.join(data_dir, "activities.csv"), index=False)
+
+
+def _old_prompt_tokens(app_module, request) -> int:
+    """Token count of the prompt the endpoint used to build"""
+    destinations = app_module.repo.table("destinations").to_dict('records')
+    hotels = app_module.repo.table("hotels").to_dict('records')
+    activities = app_module.repo.table("activities").to_dict('records')
+    return app_module.count_tokens(
+        f"{request.duration} {request.budget} {request.interests} {request.travel_style}"
+        f"{destinations}{hotels}{activities}"
+    )
+
+
+def main(args):
+    data_dir = os.path.join(tempfile.mkdtemp(prefix="travel-test-"), "data")
+    shutil.copytree(os.path.join(HERE, "data"), data_dir)
+    os.environ["TRAVEL_DATA_DIR"] = data_dir
+    sys.path.insert(0, HERE)
+    import main as app_module
+
+    budget = app_module.config.ITINERARY_PROMPT_TOKENS
+    request = app_module.RecommendationRequest(destination_id=1, budget=2000, duration=5,
+                                               interests=["Culture", "Food"], travel_style="Mid-range")
+
+    def prompt_with_budget(tokens: int) -> str:
+        app_module.config.ITINERARY_PROMPT_TOKENS = tokens
+        try:
+            return app_module.itinerary_prompt(request)
+        finally:
+            app_module.config.ITINERARY_PROMPT_TOKENS = budget
+
+    print(f"🧾 Itinerary prompt size (budget {budget} tokens of catalog data)")
+    ok = True
+    for rows in args.sizes:
+        _write_catalog(data_dir, rows)
+        limit = app_module.count_tokens(prompt_with_budget(0)) + budget
+        prompt = app_module.itinerary_prompt(request)
+        tokens = app_module.count_tokens(prompt)
+        old = _old_prompt_tokens(app_module, request)
+        first = prompt.find("Destination 1:")
+        first_ok = first != -1 and first < prompt.find("Hotels in") and "Destination 2:" not in prompt[:first]
+        status = "✅" if tokens <= limit and first_ok else "❌"
+        ok = ok and status == "✅"
+        print(f"{status} {rows:>6} rows per table: {tokens:>5} prompt tokens, limit {limit} (old prompt {old:>9,})")
+        if not first_ok:
+            print("   ❌ requested destination's rows are not first in the prompt")
+
+    shutil.rmtree(os.path.dirname(data_dir), ignore_errors=True)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=lambda v: [int(x) for x in v.split(",")], default=[10, 100, 1000, 10000])
+    sys.exit(0 if main(parser.parse_args()) else 1)
@@ -0,0 +1,7 @@
+"""
+Modules shared by the FastAPI apps in this repository.
+
+Each app runs from its own directory (`uvicorn main:app`), so its main.py
+puts the repository root on sys.path before importing from here. Deploy an
+app together with this directory.
+"""
@@ -0,0 +1,159 @@
+"""
+Columnar (Parquet / Arrow IPC) encoding of customers for the export endpoints
+of FastAPICRMLeadTime and FastAPICRMLeadTimeDB.
+
+Both writers take Arrow record batches one at a time and hand back the bytes
+produced so far, so an endpoint can stream a large export page by page.
+pyarrow is optional; ARROW_AVAILABLE is False when it is not installed.
+"""
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+ARROW_AVAILABLE = pa is not None
+
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+if ARROW_AVAILABLE:
+    _TS = pa.timestamp("us", tz="UTC")
+    SCHEMA = pa.schema([
+        pa.field("id", pa.int64(), nullable=False),
+        pa.field("name", pa.string(), nullable=False),
+        pa.field("email", pa.string(), nullable=False),
+        pa.field("phone", pa.string()),
+        pa.field("address", pa.string()),
+        pa.field("country", pa.string()),
+        pa.field("goal", pa.string()),
+        pa.field("budget", pa.string()),
+        pa.field("webinar_join", _TS),
+        pa.field("webinar_leave", _TS),
+        pa.field("asked_q", pa.bool_(), nullable=False),
+        pa.field("referred", pa.bool_(), nullable=False),
+        pa.field("past_touchpoints", pa.int32(), nullable=False),
+        pa.field("created_at", _TS, nullable=False),
+        pa.field("closed_at", _TS),
+        pa.field("engaged_mins", pa.int32()),
+        pa.field("score", pa.int32()),
+        pa.field("reasoning", pa.string()),
+        pa.field("status", pa.string()),
+        pa.field("lead_time_days", pa.int32()),
+    ])
+else:
+    SCHEMA = None
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Naive datetimes in the CRM are UTC (created_at defaults to utcnow())
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def customers_to_batch(customers: Iterable) -> "pa.RecordBatch":
+    """Build one record batch from Customer models, column by column"""
+    customers = list(customers)
+    columns = {field.name: [] for field in SCHEMA}
+    for c in customers:
+        lead_time_days = None
+        if c.closed_at is not None:
+            lead_time_days = max(0, (c.closed_at - c.created_at).days)
+        columns["id"].append(c.id)
+        columns["name"].append(c.name)
+        columns["email"].append(c.email)
+        columns["phone"].append(c.phone)
+        columns["address"].append(c.address)
+        columns["country"].append(c.country)
+        columns["goal"].append(c.goal)
+        columns["budget"].append(c.budget)
+        columns["webinar_join"].append(_utc(c.webinar_join))
+        columns["webinar_leave"].append(_utc(c.webinar_leave))
+        columns["asked_q"].append(c.asked_q)
+        columns["referred"].append(c.referred)
+        columns["past_touchpoints"].append(c.past_touchpoints)
+        columns["created_at"].append(_utc(c.created_at))
+        columns["closed_at"].append(_utc(c.closed_at))
+        columns["engaged_mins"].append(c.engaged_mins)
+        columns["score"].append(c.score)
+        columns["reasoning"].append(c.reasoning)
+        columns["status"].append(c.status)
+        columns["lead_time_days"].append(lead_time_days)
+    arrays = [pa.array(columns[field.name], type=field.type) for field in SCHEMA]
+    return pa.RecordBatch.from_arrays(arrays, schema=SCHEMA)
+
+
+class _DrainSink:
+    """Write-only file object whose buffered bytes can be taken at any time.
+
+    tell() keeps counting across drains, which the Parquet writer relies on
+    for the offsets it records in the footer.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks = []
+        return out
+
+
+class ParquetStream:
+    """Incremental Parquet writer: one row group per write() call"""
+
+    def __init__(self, compression: str = "zstd"):
+        self._sink = _DrainSink()
+        self._writer = pq.ParquetWriter(pa.PythonFile(self._sink, mode="w"), SCHEMA, compression=compression)
+
+    def write(self, batch: "pa.RecordBatch") -> bytes:
+        if batch.num_rows:
+            self._writer.write_batch(batch)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class ArrowStream:
+    """Incremental Arrow IPC stream writer (LZ4-compressed record batches)"""
+
+    def __init__(self, compression: Optional[str] = "lz4"):
+        self._sink = _DrainSink()
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        self._writer = pa.ipc.new_stream(pa.PythonFile(self._sink, mode="w"), SCHEMA, options=options)
+
+    def write(self, batch: "pa.RecordBatch") -> bytes:
+        if batch.num_rows:
+            self._writer.write_batch(batch)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
@@ -0,0 +1,174 @@
+"""
+Response compression middleware (zstd or gzip, negotiated per request).
+Used by FastAPICRMLeadTime, FastAPICRMLeadTimeDB and TravelPlanner.
+
+- Picks zstd when the client accepts it and `zstandard` is installed, else gzip.
+- Single-body responses smaller than `minimum_size` go out untouched.
+- Streaming responses are compressed chunk by chunk with a flush after each
+  one, so the client still sees data as soon as the app produces it.
+- Server-sent events and formats that are already compressed are skipped.
+"""
+import gzip
+import zlib
+from typing import List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SKIP_CONTENT_TYPES = (
+    "text/event-stream",
+    "application/vnd.apache.parquet",
+    "application/vnd.apache.arrow",
+    "application/zip",
+    "application/gzip",
+    "image/",
+    "video/",
+    "audio/",
+)
+
+
+def _accepted_encodings(header: str) -> List[str]:
+    """Encodings from an Accept-Encoding header, without q=0 entries"""
+    accepted = []
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.append(token)
+    return accepted
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    def _choose(self, scope) -> Optional[str]:
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accepted = _accepted_encodings(value.decode("latin-1"))
+                if "zstd" in accepted and zstandard is not None:
+                    return "zstd"
+                if "gzip" in accepted:
+                    return "gzip"
+                return None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.mw = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message = None
+        self.passthrough = False
+        self.compressor = None
+
+    def _headers(self) -> List[Tuple[bytes, bytes]]:
+        return list(self.start_message.get("headers", []))
+
+    def _should_skip(self) -> bool:
+        for name, value in self._headers():
+            if name == b"content-encoding":
+                return True
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+                if content_type.startswith(SKIP_CONTENT_TYPES):
+                    return True
+        return False
+
+    async def _start_compressed(self) -> None:
+        if self.encoding == "zstd":
+            self.compressor = _Zstd(self.mw.zstd_level)
+        else:
+            self.compressor = _Gzip(self.mw.gzip_level)
+        headers = [(k, v) for k, v in self._headers() if k not in (b"content-length", b"vary")]
+        vary = [v for k, v in self._headers() if k == b"vary"]
+        headers.append((b"content-encoding", self.encoding.encode()))
+        headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+        await self._send({**self.start_message, "headers": headers})
+
+    async def _flush_uncompressed(self, body: bytes) -> None:
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": body, "more_body": False})
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = self._should_skip() or message.get("status", 200) in (204, 304)
+            if self.passthrough:
+                await self._send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            # A single-shot body under the threshold is not worth compressing.
+            # A streaming body (more_body) starts compressing straight away so
+            # its first bytes are not held back waiting for the threshold.
+            if not more_body and len(body) < self.mw.minimum_size:
+                await self._flush_uncompressed(body)
+                return
+            await self._start_compressed()
+
+        await self._send({
+            "type": "http.response.body",
+            "body": self.compressor.compress(body, final=not more_body),
+            "more_body": more_body,
+        })
+
+
+def decompress(body: bytes, encoding: str) -> bytes:
+    """Inverse of the middleware; used by the benchmarks to check round trips"""
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return body
@@ -0,0 +1,714 @@
+"""
+Storage backends for the CRM APIs (FastAPICRM, FastAPICRMLeadTime and
+FastAPICRMLeadTimeDB).
+
+Every backend speaks the same row format that `model_to_row` produces
+(ISO strings for datetimes, plain ints/bools) so the handlers do not care
+where a customer lives. FastAPICRMLeadTimeDB picks the backend with
+CRM_STORAGE:
+
+    supabase (default)  hosted Postgres through the async PostgREST client
+    sqlite              embedded SQLite file in WAL mode (CRM_SQLITE_PATH)
+    csv                 single CSV file rewritten on every change (CRM_CSV_PATH)
+    memory              process-local dict, lost on restart
+"""
+import csv
+import os
+import uuid
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+# Column order shared by the CSV file, the SQLite table and the exports
+COLUMNS = [
+    'id', 'name', 'email', 'phone', 'address', 'country', 'goal', 'budget',
+    'webinar_join', 'webinar_leave', 'asked_q', 'referred', 'past_touchpoints',
+    'created_at', 'closed_at', 'engaged_mins', 'score', 'reasoning', 'status',
+]
+INT_COLUMNS = {'id', 'past_touchpoints', 'engaged_mins', 'score'}
+BOOL_COLUMNS = {'asked_q', 'referred'}
+
+# Aggregations served by /customers/stats/*; group_by must be one of these
+GROUP_COLUMNS = ('country', 'budget', 'referred')
+STATS = ('lead_time', 'status', 'score')
+PERCENTILES = (0.5, 0.75, 0.9)
+
+
+class CustomerStore(ABC):
+    """Async repository interface over customer rows"""
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, id: int) -> Optional[Dict[str, Any]]:
+        """Return the row for `id` or None"""
+
+    async def exists(self, id: int) -> bool:
+        return await self.get(id) is not None
+
+    @abstractmethod
+    async def list(self) -> List[Dict[str, Any]]:
+        """Return every row ordered by id"""
+
+    async def iter_pages(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield every row ordered by id, `page_size` rows at a time"""
+        rows = await self.list()
+        for i in range(0, len(rows), page_size):
+            yield rows[i:i + page_size]
+
+    @abstractmethod
+    async def insert(self, row: Dict[str, Any]) -> None:
+        """Insert a new row; the caller has checked the id is free"""
+
+    @abstractmethod
+    async def update(self, id: int, fields: Dict[str, Any]) -> bool:
+        """Update the given fields of `id`; False when it does not exist"""
+
+    @abstractmethod
+    async def delete(self, id: int) -> Optional[Dict[str, Any]]:
+        """Delete `id` and return the removed row, or None if missing"""
+
+    @abstractmethod
+    async def changes(self, since: Optional[str]) -> Dict[str, Any]:
+        """Rows created/updated and ids deleted after watermark `since`.
+
+        Returns {'watermark', 'reset', 'changed', 'deleted'}. Watermarks are
+        opaque strings; `reset` is True when `since` is missing or no longer
+        valid, in which case `changed` holds every row and the client should
+        drop its cache.
+        """
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert or replace a batch of rows in one round trip where possible"""
+        for row in rows:
+            if not await self.update(int(row['id']), row):
+                await self.insert(row)
+
+    async def aggregate(self, stat: str, group_by: Optional[str] = None, bucket_size: int = 10) -> List[Dict[str, Any]]:
+        """Compute one of STATS, optionally grouped by one of GROUP_COLUMNS.
+
+        Fallback for stores without a query engine: aggregates over list().
+        """
+        return _aggregate_rows(await self.list(), stat, group_by, bucket_size)
+
+    async def close(self) -> None:
+        pass
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+
+def _group_key(row: Dict[str, Any], group_by: Optional[str]) -> Optional[str]:
+    if group_by is None:
+        return None
+    value = row.get(group_by)
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def _nearest_rank(sorted_values: List[int], p: float) -> Optional[float]:
+    """percentile_disc: smallest value whose cumulative share reaches p"""
+    if not sorted_values:
+        return None
+    n = len(sorted_values)
+    for i, value in enumerate(sorted_values, start=1):
+        if i >= p * n:
+            return float(value)
+    return float(sorted_values[-1])
+
+
+def _group_order(key: Optional[str]):
+    return (key is None, key or '')
+
+
+def _aggregate_rows(rows: List[Dict[str, Any]], stat: str, group_by: Optional[str], bucket_size: int) -> List[Dict[str, Any]]:
+    if group_by is not None and group_by not in GROUP_COLUMNS:
+        raise ValueError(f"Unsupported group_by: {group_by}")
+    if stat == 'lead_time':
+        groups: Dict[Optional[str], List[Optional[int]]] = {}
+        for row in rows:
+            created, closed = _parse_ts(row.get('created_at')), _parse_ts(row.get('closed_at'))
+            lead_days = max(0, (closed - created).days) if closed is not None and created is not None else None
+            groups.setdefault(_group_key(row, group_by), []).append(lead_days)
+        result = []
+        for key in sorted(groups, key=_group_order):
+            closed_days = sorted(d for d in groups[key] if d is not None)
+            entry: Dict[str, Any] = {
+                'group': key,
+                'customers': len(groups[key]),
+                'closed': len(closed_days),
+                'avg_days': sum(closed_days) / len(closed_days) if closed_days else None,
+            }
+            for p in PERCENTILES:
+                entry[f'p{int(p * 100)}_days'] = _nearest_rank(closed_days, p)
+            result.append(entry)
+        return result
+    if stat == 'status':
+        counts = Counter((_group_key(r, group_by), r.get('status')) for r in rows)
+        return [
+            {'group': g, 'status': s, 'count': n}
+            for (g, s), n in sorted(counts.items(), key=lambda kv: (_group_order(kv[0][0]), _group_order(kv[0][1])))
+        ]
+    if stat == 'score':
+        counts = Counter(
+            (_group_key(r, group_by), (int(r['score']) // bucket_size) * bucket_size)
+            for r in rows if r.get('score') is not None
+        )
+        return [
+            {'group': g, 'bucket': b, 'count': n}
+            for (g, b), n in sorted(counts.items(), key=lambda kv: (_group_order(kv[0][0]), kv[0][1]))
+        ]
+    raise ValueError(f"Unknown stat: {stat}")
+
+
+def model_to_row(customer: Any) -> Dict[str, Any]:
+    """Storage row for a customer model: the COLUMNS it has, datetimes as ISO strings"""
+    row: Dict[str, Any] = {}
+    for col in COLUMNS:
+        if col in customer.__dict__:
+            value = customer.__dict__[col]
+            row[col] = value.isoformat() if isinstance(value, datetime) else value
+    return row
+
+
+def coerce_csv_record(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a CSV row (all strings) back into typed row values"""
+    row: Dict[str, Any] = {}
+    for col in COLUMNS:
+        value = raw.get(col)
+        if value is None or value == '':
+            row[col] = None
+        elif col in INT_COLUMNS:
+            row[col] = int(float(value))
+        elif col in BOOL_COLUMNS:
+            row[col] = str(value).strip().lower() in ('true', '1', 'yes')
+        else:
+            row[col] = value
+    return row
+
+
+class MemoryStore(CustomerStore):
+    """Rows kept in a process-local dict keyed by id (FastAPICRM's storage).
+
+    Every write stamps the row with the next value of an in-process change
+    sequence and deletes leave a tombstone, which is what changes() reads.
+    The sequence restarts with the process, so watermarks carry a per-process
+    epoch and a stale one forces a reset.
+    """
+
+    name = "memory"
+
+    def __init__(self, rows: Optional[List[Dict[str, Any]]] = None):
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._epoch = uuid.uuid4().hex[:12]
+        self._seq = 0
+        self._versions: Dict[int, int] = {}
+        self._tombstones: Dict[int, int] = {}
+        for row in rows or []:
+            self._put(dict(row))
+
+    def _put(self, row: Dict[str, Any]) -> None:
+        key = int(row['id'])
+        self._seq += 1
+        self._rows[key] = row
+        self._versions[key] = self._seq
+        self._tombstones.pop(key, None)
+
+    def _remove(self, id: int) -> Optional[Dict[str, Any]]:
+        row = self._rows.pop(id, None)
+        if row is not None:
+            self._seq += 1
+            self._versions.pop(id, None)
+            self._tombstones[id] = self._seq
+        return row
+
+    async def get(self, id: int) -> Optional[Dict[str, Any]]:
+        row = self._rows.get(id)
+        return dict(row) if row is not None else None
+
+    async def exists(self, id: int) -> bool:
+        return id in self._rows
+
+    async def list(self) -> List[Dict[str, Any]]:
+        return [dict(self._rows[k]) for k in sorted(self._rows)]
+
+    async def iter_pages(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        keys = sorted(self._rows)
+        for i in range(0, len(keys), page_size):
+            yield [dict(self._rows[k]) for k in keys[i:i + page_size] if k in self._rows]
+
+    async def insert(self, row: Dict[str, Any]) -> None:
+        self._put(dict(row))
+        self._changed()
+
+    async def update(self, id: int, fields: Dict[str, Any]) -> bool:
+        if id not in self._rows:
+            return False
+        row = dict(self._rows[id])
+        row.update(fields)
+        if int(row['id']) != id:
+            self._remove(id)
+        self._put(row)
+        self._changed()
+        return True
+
+    async def delete(self, id: int) -> Optional[Dict[str, Any]]:
+        row = self._remove(id)
+        if row is not None:
+            self._changed()
+        return row
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._put(dict(row))
+        self._changed()
+
+    async def changes(self, since: Optional[str]) -> Dict[str, Any]:
+        after = None
+        if since:
+            epoch, _, seq = since.partition(':')
+            if epoch == self._epoch and seq.isdigit() and int(seq) <= self._seq:
+                after = int(seq)
+        if after is None:
+            changed = await self.list()
+            deleted: List[int] = []
+        else:
+            changed = [dict(self._rows[k]) for k, v in self._versions.items() if v > after]
+            changed.sort(key=lambda r: int(r['id']))
+            deleted = sorted(k for k, v in self._tombstones.items() if v > after)
+        return {
+            'watermark': f"{self._epoch}:{self._seq}",
+            'reset': after is None,
+            'changed': changed,
+            'deleted': deleted,
+        }
+
+    def _changed(self) -> None:
+        pass
+
+
+class CsvStore(MemoryStore):
+    """In-memory rows persisted by rewriting a CSV file on every change.
+
+    FastAPICRMLeadTime's storage; reads and writes the same customers.csv
+    layout that app has always used.
+    """
+
+    name = "csv"
+
+    def __init__(self, path: str):
+        self.path = path
+        rows = []
+        if os.path.exists(path):
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = [coerce_csv_record(r) for r in csv.DictReader(f)]
+        super().__init__(rows)
+
+    def _changed(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            for key in sorted(self._rows):
+                writer.writerow(self._rows[key])
+        os.replace(tmp_path, self.path)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT,
+    address TEXT,
+    country TEXT,
+    goal TEXT,
+    budget TEXT,
+    webinar_join TEXT,
+    webinar_leave TEXT,
+    asked_q INTEGER NOT NULL DEFAULT 0,
+    referred INTEGER NOT NULL DEFAULT 0,
+    past_touchpoints INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    closed_at TEXT,
+    engaged_mins INTEGER,
+    score INTEGER,
+    reasoning TEXT,
+    status TEXT,
+    change_seq INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_customers_email ON customers(email);
+CREATE INDEX IF NOT EXISTS idx_customers_status ON customers(status);
+CREATE INDEX IF NOT EXISTS idx_customers_created_at ON customers(created_at);
+"""
+
+# Change tracking for changes(): triggers stamp every write with the next
+# value of sync_state.seq and deletes leave a tombstone.
+SQLITE_SYNC_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sync_state (id INTEGER PRIMARY KEY CHECK (id = 1), seq INTEGER NOT NULL);
+INSERT OR IGNORE INTO sync_state (id, seq) VALUES (1, 0);
+CREATE TABLE IF NOT EXISTS customer_tombstones (id INTEGER PRIMARY KEY, change_seq INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_customers_change_seq ON customers(change_seq);
+CREATE INDEX IF NOT EXISTS idx_customer_tombstones_change_seq ON customer_tombstones(change_seq);
+CREATE TRIGGER IF NOT EXISTS customers_sync_insert AFTER INSERT ON customers BEGIN
+    UPDATE sync_state SET seq = seq + 1 WHERE id = 1;
+    UPDATE customers SET change_seq = (SELECT seq FROM sync_state WHERE id = 1) WHERE id = NEW.id;
+    DELETE FROM customer_tombstones WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS customers_sync_update AFTER UPDATE OF {', '.join(COLUMNS)} ON customers BEGIN
+    UPDATE sync_state SET seq = seq + 1 WHERE id = 1;
+    UPDATE customers SET change_seq = (SELECT seq FROM sync_state WHERE id = 1) WHERE id = NEW.id;
+    INSERT OR REPLACE INTO customer_tombstones (id, change_seq)
+        SELECT OLD.id, seq FROM sync_state WHERE id = 1 AND OLD.id <> NEW.id;
+    DELETE FROM customer_tombstones WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS customers_sync_delete AFTER DELETE ON customers BEGIN
+    UPDATE sync_state SET seq = seq + 1 WHERE id = 1;
+    INSERT OR REPLACE INTO customer_tombstones (id, change_seq)
+        SELECT OLD.id, seq FROM sync_state WHERE id = 1;
+END;
+"""
+
+
+class SqliteStore(CustomerStore):
+    """Embedded SQLite database in WAL mode; `id` is the primary key"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+        existing = {r['name'] for r in self._conn.execute("PRAGMA table_info(customers)")}
+        if 'change_seq' not in existing:
+            # Databases created before change tracking existed
+            self._conn.execute("ALTER TABLE customers ADD COLUMN change_seq INTEGER")
+        self._conn.executescript(SQLITE_SYNC_SCHEMA)
+        self._conn.commit()
+
+    def _run(self, sql: str, params: tuple = (), fetch: bool = False) -> List[sqlite3.Row]:
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+            rows = cur.fetchall() if fetch else []
+            self._conn.commit()
+            return rows
+
+    @staticmethod
+    def _to_row(record: sqlite3.Row) -> Dict[str, Any]:
+        row = dict(record)
+        row.pop('change_seq', None)
+        for col in BOOL_COLUMNS:
+            row[col] = bool(row[col])
+        return row
+
+    async def get(self, id: int) -> Optional[Dict[str, Any]]:
+        rows = await run_in_threadpool(self._run, "SELECT * FROM customers WHERE id = ?", (id,), True)
+        return self._to_row(rows[0]) if rows else None
+
+    async def exists(self, id: int) -> bool:
+        rows = await run_in_threadpool(self._run, "SELECT 1 FROM customers WHERE id = ?", (id,), True)
+        return bool(rows)
+
+    async def list(self) -> List[Dict[str, Any]]:
+        rows = await run_in_threadpool(self._run, "SELECT * FROM customers ORDER BY id", (), True)
+        return [self._to_row(r) for r in rows]
+
+    async def iter_pages(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        last_id = None
+        while True:
+            if last_id is None:
+                sql, params = "SELECT * FROM customers ORDER BY id LIMIT ?", (page_size,)
+            else:
+                sql, params = "SELECT * FROM customers WHERE id > ? ORDER BY id LIMIT ?", (last_id, page_size)
+            rows = await run_in_threadpool(self._run, sql, params, True)
+            if not rows:
+                return
+            yield [self._to_row(r) for r in rows]
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]['id']
+
+    async def insert(self, row: Dict[str, Any]) -> None:
+        cols = [c for c in COLUMNS if c in row]
+        sql = f"INSERT INTO customers ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})"
+        await run_in_threadpool(self._run, sql, tuple(row[c] for c in cols))
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        updates = ', '.join(f'{c} = excluded.{c}' for c in COLUMNS if c != 'id')
+        sql = (
+            f"INSERT INTO customers ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}"
+        )
+        params = [tuple(row.get(c) for c in COLUMNS) for row in rows]
+
+        def _upsert() -> None:
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(sql, params)
+
+        await run_in_threadpool(_upsert)
+
+    async def update(self, id: int, fields: Dict[str, Any]) -> bool:
+        cols = [c for c in COLUMNS if c in fields]
+
+        def _update() -> bool:
+            with self._lock:
+                cur = self._conn.execute(
+                    f"UPDATE customers SET {', '.join(f'{c} = ?' for c in cols)} WHERE id = ?",
+                    tuple(fields[c] for c in cols) + (id,),
+                )
+                self._conn.commit()
+                return cur.rowcount > 0
+
+        return await run_in_threadpool(_update)
+
+    async def delete(self, id: int) -> Optional[Dict[str, Any]]:
+        def _delete() -> Optional[Dict[str, Any]]:
+            with self._lock:
+                found = self._conn.execute("SELECT * FROM customers WHERE id = ?", (id,)).fetchone()
+                if found is None:
+                    return None
+                self._conn.execute("DELETE FROM customers WHERE id = ?", (id,))
+                self._conn.commit()
+                return self._to_row(found)
+
+        return await run_in_threadpool(_delete)
+
+    async def changes(self, since: Optional[str]) -> Dict[str, Any]:
+        def _changes() -> Dict[str, Any]:
+            with self._lock:
+                seq = self._conn.execute("SELECT seq FROM sync_state WHERE id = 1").fetchone()[0]
+                after = int(since) if since and since.isdigit() and int(since) <= seq else None
+                if after is None:
+                    rows = self._conn.execute("SELECT * FROM customers ORDER BY id").fetchall()
+                    deleted = []
+                else:
+                    rows = self._conn.execute(
+                        "SELECT * FROM customers WHERE change_seq > ? ORDER BY id", (after,)
+                    ).fetchall()
+                    deleted = [r[0] for r in self._conn.execute(
+                        "SELECT id FROM customer_tombstones WHERE change_seq > ? ORDER BY id", (after,)
+                    )]
+                return {
+                    'watermark': str(seq),
+                    'reset': after is None,
+                    'changed': [self._to_row(r) for r in rows],
+                    'deleted': deleted,
+                }
+
+        return await run_in_threadpool(_changes)
+
+    async def aggregate(self, stat: str, group_by: Optional[str] = None, bucket_size: int = 10) -> List[Dict[str, Any]]:
+        if group_by is not None and group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        if group_by == 'referred':
+            grp = "CASE WHEN referred THEN 'true' ELSE 'false' END"
+        else:
+            grp = group_by or 'NULL'
+        if stat == 'lead_time':
+            percentiles = ",\n".join(
+                f"MIN(CASE WHEN rn >= {p} * closed THEN lead_days END) AS p{int(p * 100)}_days" for p in PERCENTILES
+            )
+            sql = f"""
+                WITH t AS (
+                    SELECT {grp} AS grp,
+                           CASE WHEN closed_at IS NULL THEN NULL
+                                ELSE MAX(0, CAST(julianday(closed_at) - julianday(created_at) AS INTEGER))
+                           END AS lead_days
+                    FROM customers
+                ), ranked AS (
+                    SELECT grp, lead_days,
+                           ROW_NUMBER() OVER (PARTITION BY grp, lead_days IS NULL ORDER BY lead_days) AS rn,
+                           COUNT(lead_days) OVER (PARTITION BY grp) AS closed
+                    FROM t
+                )
+                SELECT grp AS "group", COUNT(*) AS customers, MAX(closed) AS closed,
+                       AVG(lead_days) AS avg_days,
+                       {percentiles}
+                FROM ranked
+                GROUP BY grp
+                ORDER BY grp IS NULL, grp
+            """
+            params: tuple = ()
+        elif stat == 'status':
+            sql = f"""
+                SELECT grp AS "group", status, COUNT(*) AS count
+                FROM (SELECT {grp} AS grp, status FROM customers)
+                GROUP BY grp, status
+                ORDER BY grp IS NULL, grp, status IS NULL, status
+            """
+            params = ()
+        elif stat == 'score':
+            sql = f"""
+                SELECT grp AS "group", bucket, COUNT(*) AS count
+                FROM (SELECT {grp} AS grp, (score / ?) * ? AS bucket FROM customers WHERE score IS NOT NULL)
+                GROUP BY grp, bucket
+                ORDER BY grp IS NULL, grp, bucket
+            """
+            params = (bucket_size, bucket_size)
+        else:
+            raise ValueError(f"Unknown stat: {stat}")
+        rows = await run_in_threadpool(self._run, sql, params, True)
+        result = [dict(r) for r in rows]
+        if stat == 'lead_time':
+            for entry in result:
+                for p in PERCENTILES:
+                    key = f'p{int(p * 100)}_days'
+                    entry[key] = float(entry[key]) if entry[key] is not None else None
+        return result
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _resp_rows(resp: Any) -> List[Dict[str, Any]]:
+    return getattr(resp, 'data', None) or (resp.get('data') if isinstance(resp, dict) else None) or []
+
+
+class SupabaseStore(CustomerStore):
+    """Supabase `customers` table through the async PostgREST client"""
+
+    name = "supabase"
+
+    def __init__(self, get_client: Callable[[], Awaitable[Any]], table: str = "customers"):
+        self._get_client = get_client
+        self.table = table
+
+    async def _table(self):
+        client = await self._get_client()
+        return client.table(self.table)
+
+    async def get(self, id: int) -> Optional[Dict[str, Any]]:
+        resp = await (await self._table()).select("*").eq("id", id).execute()
+        rows = _resp_rows(resp)
+        return rows[0] if rows else None
+
+    async def exists(self, id: int) -> bool:
+        resp = await (await self._table()).select("id").eq("id", id).execute()
+        return bool(_resp_rows(resp))
+
+    async def list(self) -> List[Dict[str, Any]]:
+        resp = await (await self._table()).select("*").order("id").execute()
+        return _resp_rows(resp)
+
+    async def iter_pages(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        # Keyset pagination on the primary key; stays cheap however deep we go
+        last_id = None
+        while True:
+            query = (await self._table()).select("*").order("id").limit(page_size)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = _resp_rows(await query.execute())
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]['id']
+
+    async def insert(self, row: Dict[str, Any]) -> None:
+        await (await self._table()).insert(row).execute()
+
+    async def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        await (await self._table()).upsert(rows, on_conflict="id").execute()
+
+    async def update(self, id: int, fields: Dict[str, Any]) -> bool:
+        resp = await (await self._table()).update(fields).eq("id", id).execute()
+        if _resp_rows(resp):
+            return True
+        # Some clients return empty data for update; verify existence
+        return await self.exists(id)
+
+    async def delete(self, id: int) -> Optional[Dict[str, Any]]:
+        row = await self.get(id)
+        if row is None:
+            return None
+        await (await self._table()).delete().eq("id", id).execute()
+        return row
+
+    # updated_at / customer_tombstones come from sql/customer_changes.sql.
+    # Rows are re-read from slightly before the watermark so a transaction that
+    # committed late with an earlier timestamp is not missed; clients merge
+    # changes idempotently, so the overlap only costs a few duplicate rows.
+    SYNC_OVERLAP = timedelta(seconds=2)
+
+    async def changes(self, since: Optional[str]) -> Dict[str, Any]:
+        try:
+            after = _parse_ts(since) if since else None
+        except ValueError:
+            after = None
+        if after is not None and after.tzinfo is None:
+            after = after.replace(tzinfo=timezone.utc)
+
+        client = await self._get_client()
+        if after is None:
+            changed = await self.list()
+            deleted: List[int] = []
+            stamps = [r.get('updated_at') for r in changed]
+        else:
+            cutoff = (after - self.SYNC_OVERLAP).isoformat()
+            resp = await client.table(self.table).select("*").gt("updated_at", cutoff).order("id").execute()
+            changed = _resp_rows(resp)
+            resp = await client.table("customer_tombstones").select("id, deleted_at").gt("deleted_at", cutoff).execute()
+            tombstones = _resp_rows(resp)
+            deleted = sorted(int(t['id']) for t in tombstones)
+            stamps = [r.get('updated_at') for r in changed] + [t.get('deleted_at') for t in tombstones]
+
+        parsed = [_parse_ts(s) for s in stamps if s]
+        if after is not None:
+            parsed.append(after)
+        latest = max(parsed) if parsed else datetime(1970, 1, 1, tzinfo=timezone.utc)
+        # 'Z' rather than '+00:00' keeps the watermark safe to paste into a URL
+        watermark = latest.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+        return {'watermark': watermark, 'reset': after is None, 'changed': changed, 'deleted': deleted}
+
+    # Postgres functions from sql/customer_stats.sql
+    RPC_FUNCTIONS = {
+        'lead_time': 'crm_lead_time_stats',
+        'status': 'crm_status_counts',
+        'score': 'crm_score_histogram',
+    }
+
+    async def aggregate(self, stat: str, group_by: Optional[str] = None, bucket_size: int = 10) -> List[Dict[str, Any]]:
+        if stat not in self.RPC_FUNCTIONS:
+            raise ValueError(f"Unknown stat: {stat}")
+        params: Dict[str, Any] = {'group_by': group_by}
+        if stat == 'score':
+            params['bucket_size'] = bucket_size
+        client = await self._get_client()
+        resp = await client.rpc(self.RPC_FUNCTIONS[stat], params).execute()
+        return _resp_rows(resp)
+
+
+def create_store(backend: str, get_supabase_client: Optional[Callable[[], Awaitable[Any]]] = None) -> CustomerStore:
+    """Build the store named by `backend` (see module docstring)"""
+    backend = (backend or "supabase").strip().lower()
+    if backend == "memory":
+        return MemoryStore()
+    if backend == "csv":
+        return CsvStore(os.getenv("CRM_CSV_PATH", "customers.csv"))
+    if backend == "sqlite":
+        return SqliteStore(os.getenv("CRM_SQLITE_PATH", "customers.db"))
+    if backend == "supabase":
+        if get_supabase_client is None:
+            raise ValueError("supabase backend needs a client factory")
+        return SupabaseStore(get_supabase_client)
+    raise ValueError(f"Unknown CRM_STORAGE backend: {backend}")